@@ -4,14 +4,23 @@ Backend configuration for Medical Chatbot API.
 Reuses the main settings.py from the project root and adds backend-specific settings.
 """
 
+import functools
 import sys
 from pathlib import Path
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
-# Add parent directory to path to import main settings
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from settings import get_settings as get_main_settings
+# The root settings module is normally importable via `pip install -e .`
+# (see pyproject.toml) or, in Docker, because it sits beside main.py.
+# Fall back to a single guarded path insert for ad-hoc local runs;
+# the guard keeps repeated imports from growing sys.path.
+try:
+    from settings import get_settings as get_main_settings
+except ImportError:
+    _root = str(Path(__file__).parent.parent)
+    if _root not in sys.path:
+        sys.path.insert(0, _root)
+    from settings import get_settings as get_main_settings
 
 
 class BackendSettings(BaseSettings):
@@ -50,11 +59,14 @@ class BackendSettings(BaseSettings):
     )
 
 
-# Singleton instances
-_main_settings: Optional[object] = None
-_backend_settings: Optional[BackendSettings] = None
+# lru_cache makes repeat lookups a C-level cache hit on a thread-safe
+# cache structure. It does NOT serialize the first call: two threads
+# racing it can each run the factory, with one result kept - fine for
+# these idempotent loaders, but don't put non-idempotent side effects
+# behind them.
 
 
+@functools.lru_cache(maxsize=1)
 def get_settings():
     """
     Get the main application settings (from root settings.py).
@@ -62,12 +74,10 @@ def get_settings():
     Returns:
         Settings instance with Azure credentials
     """
-    global _main_settings
-    if _main_settings is None:
-        _main_settings = get_main_settings()
-    return _main_settings
+    return get_main_settings()
 
 
+@functools.lru_cache(maxsize=1)
 def get_backend_settings() -> BackendSettings:
     """
     Get backend-specific settings.
@@ -75,7 +85,4 @@ def get_backend_settings() -> BackendSettings:
     Returns:
         BackendSettings instance
     """
-    global _backend_settings
-    if _backend_settings is None:
-        _backend_settings = BackendSettings()
-    return _backend_settings
+    return BackendSettings()
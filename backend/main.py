@@ -7,29 +7,41 @@ RESTful API with two endpoints:
 
 Architecture:
 - Stateless backend (all context in request body)
-- Rate limiting with semaphore (max 10 concurrent OpenAI calls)
+- Rate limiting with a resizable admission controller (concurrent OpenAI calls)
 - Lifespan management for vector store initialization
 """
 
+import asyncio
 import logging
-import sys
-from pathlib import Path
+import os
+import time
 from contextlib import asynccontextmanager
-from datetime import datetime
-from asyncio import Semaphore
+from datetime import datetime, timezone
 
+import orjson
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
-# Add parent directory to path for local development
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# The shared root settings module is resolved by config.py (installed via
+# `pip install -e .`, with a guarded path fallback for ad-hoc local runs),
+# so no sys.path mutation is needed here.
 
 # Use relative imports that work both locally and in Docker
-from models import ChatRequest, ChatResponse, HealthResponse
-from services.vector_store import get_vector_store
-from services.collection_handler import handle_collection_phase
-from services.qa_handler import handle_qa_phase
+# Note: services.* modules are imported lazily inside the handlers below.
+# Their transitive imports (ChromaDB, Azure OpenAI SDK) cost seconds at
+# module init; deferring them keeps cold start and --reload cycles fast
+# while sys.modules makes every subsequent lookup a dict hit.
+from models import (
+    BatchChatRequest,
+    BatchChatResponse,
+    ChatRequest,
+    ChatResponse,
+    HealthResponse,
+    Message,
+    Source,
+    UserData,
+)
 from config import get_backend_settings
 
 # Setup logging
@@ -39,9 +51,51 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Rate limiting: Max 10 concurrent OpenAI API calls
+class AdmissionController:
+    """
+    Condition-variable based admission controller for OpenAI API calls.
+
+    Unlike asyncio.Semaphore, the concurrency cap can be resized safely at
+    runtime via set_limit() (e.g. from an admin hook reacting to Azure 429
+    telemetry) without restarting the process.
+    """
+
+    def __init__(self, cap: int):
+        self._cap = cap
+        self._active = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot, then claim it."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self._cap)
+            self._active += 1
+
+    async def release(self) -> None:
+        """Release a claimed slot and wake one waiter."""
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+
+    async def set_limit(self, n: int) -> None:
+        """Resize the concurrency cap and wake all waiters to re-check."""
+        async with self._cond:
+            self._cap = n
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Async context manager wrapping acquire/release."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+
+# Rate limiting: bound concurrent OpenAI API calls
 # This prevents overwhelming Azure OpenAI and hitting rate limits
-openai_semaphore = Semaphore(10)
+admission = AdmissionController(get_backend_settings().MAX_CONCURRENT_OPENAI_CALLS)
 
 
 @asynccontextmanager
@@ -58,53 +112,103 @@ async def lifespan(app: FastAPI):
 
     try:
         # Initialize vector store for RAG retrieval
-        vector_store = get_vector_store()
+        from services.vector_store import get_vector_store
+
+        # Stash the instance on app.state: health probes then do a plain
+        # attribute read instead of going back through the factory.
+        app.state.vector_store = get_vector_store()
         logger.info("Vector store initialized successfully")
 
+        # Warm the pydantic validators/serializers now so the first real
+        # request doesn't pay for deferred core-schema builds. One full
+        # validate+dump round trip compiles every schema we serve.
+        for model in (Message, Source, UserData, ChatRequest, ChatResponse, HealthResponse):
+            model.model_rebuild(force=False)
+        warmup = ChatRequest.model_validate({
+            "message": "ping",
+            "conversation_history": [{"role": "user", "content": "ping"}]
+        })
+        ChatResponse(
+            response="", phase="collection", user_data=warmup.user_data
+        ).model_dump()
+
         # Log settings
         settings = get_backend_settings()
-        logger.info(f"Settings loaded: RAG_TOP_K={settings.RAG_TOP_K}")
+        logger.info("Settings loaded: RAG_TOP_K=%d", settings.RAG_TOP_K)
         logger.info("Startup complete - API ready to serve requests")
 
     except Exception as e:
-        logger.error(f"Startup failed: {e}")
+        logger.error("Startup failed: %s", e)
         raise
 
     yield
 
     # Shutdown
     logger.info("Shutting down Medical Services Chatbot API...")
+
+    # Close the shared OpenAI HTTP connection pool if it was created
+    from services import openai_client as openai_client_module
+    if openai_client_module._openai_client is not None:
+        await openai_client_module._openai_client.aclose()
+
     logger.info("Shutdown complete")
 
 
+# Serving the interactive docs requires the large fastapi.openapi.models
+# tree (~65ms import + memory per worker). Keep them on for dev, let
+# production deployments switch them off with ENABLE_DOCS=0.
+ENABLE_DOCS = os.environ.get("ENABLE_DOCS", "1") == "1"
+
 # Create FastAPI app with lifespan
 app = FastAPI(
     title="Medical Services Chatbot API",
     description="RESTful API for Israeli health fund services chatbot with RAG",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    docs_url="/docs" if ENABLE_DOCS else None,
+    redoc_url=None,
+    openapi_url="/openapi.json" if ENABLE_DOCS else None,
+    # orjson serializes our response payloads (nested user_data + sources)
+    # several times faster than the stdlib json encoder
+    default_response_class=ORJSONResponse
 )
 
-# Add CORS middleware (allow all origins for development)
-# In production, replace "*" with specific frontend URL
+# Add CORS middleware with the explicit allowlist from settings.
+# Avoiding the "*" wildcard keeps Starlette on its precomputed-header path
+# (simple_headers/preflight_headers built once at init) instead of
+# reflecting the Origin into the response on every request.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # TODO: Restrict in production
+    allow_origins=get_backend_settings().CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=("GET", "POST", "OPTIONS"),
+    allow_headers=("Content-Type", "Authorization"),
 )
 
 
+# Traceback formatting is expensive; during an error storm we keep full
+# tracebacks for every 16th unexpected error and log the rest as one-liners.
+_err_count = 0
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """
-    Global exception handler for unhandled errors.
+    Global exception handler for unexpected errors.
 
-    Logs the error and returns a clean JSON response to the client.
+    HTTPExceptions are re-raised so FastAPI's own handler serves them
+    without the cost of formatting a traceback. Other errors are logged
+    with a sampled traceback and returned as a clean JSON response.
     """
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    global _err_count
+    if isinstance(exc, HTTPException):
+        raise exc
+    _err_count += 1
+    if _err_count % 16 == 1:
+        logger.error("Unhandled exception: %s", exc, exc_info=True)
+    else:
+        logger.warning("Unhandled exception (traceback sampled out): %s", exc)
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -124,7 +228,7 @@ async def chat_endpoint(request: ChatRequest):
     3. If complete → Q&A phase (answer questions using RAG)
 
     Rate Limiting:
-    - Uses semaphore to limit concurrent OpenAI API calls to 10
+    - Uses the admission controller to bound concurrent OpenAI API calls
     - Prevents overwhelming Azure OpenAI service
 
     Args:
@@ -137,39 +241,179 @@ async def chat_endpoint(request: ChatRequest):
         HTTPException: If processing fails
     """
     try:
-        # Use semaphore for rate limiting
-        async with openai_semaphore:
-            logger.info(f"Chat request: phase check, message length={len(request.message)}")
+        # Cheap pre-check: an empty message never reaches OpenAI, so don't
+        # let it consume one of the limited admission slots either.
+        ud = request.user_data
+
+        if not request.message.strip():
+            missing = ud.get_missing_fields()
+            in_collection = bool(missing) or not ud.confirmed
+            return ChatResponse(
+                response="",
+                phase="collection" if in_collection else "qa",
+                user_data=ud,
+                missing_fields=missing
+            )
+
+        # Use admission controller for rate limiting
+        async with admission.slot():
+            logger.info("Chat request: phase check, message length=%d", len(request.message))
 
             # Check if user data is complete AND confirmed
             # Stay in collection phase until user explicitly confirms
-            if not request.user_data.is_complete() or not request.user_data.confirmed:
+            # (one field scan per request: completeness derived from missing fields)
+            missing_fields = ud.get_missing_fields()
+            is_complete = not missing_fields
+
+            if not is_complete or not ud.confirmed:
                 # Collection phase: gather user information
-                logger.info(f"→ Collection phase (complete={request.user_data.is_complete()}, confirmed={request.user_data.confirmed})")
+                from services.collection_handler import handle_collection_phase
+
+                logger.info("→ Collection phase (complete=%s, confirmed=%s)", is_complete, ud.confirmed)
                 response = await handle_collection_phase(request)
-                logger.info(f"← Collection phase complete: missing_fields={response.missing_fields}")
+                logger.info("← Collection phase complete: missing_fields=%s", response.missing_fields)
                 return response
 
             else:
                 # Q&A phase: answer questions using RAG
-                logger.info(f"→ Q&A phase: hmo={request.user_data.hmo}, tier={request.user_data.tier}")
+                from services.qa_handler import handle_qa_phase
+
+                logger.info("→ Q&A phase: hmo=%s, tier=%s", ud.hmo, ud.tier)
                 response = await handle_qa_phase(request)
                 logger.info(
-                    f"← Q&A phase complete: chunks={response.metadata.get('chunks_retrieved')}, "
-                    f"tokens={response.metadata.get('tokens_used')}"
+                    "← Q&A phase complete: chunks=%s, tokens=%s",
+                    response.metadata.get("chunks_retrieved"),
+                    response.metadata.get("tokens_used")
                 )
                 return response
 
     except Exception as e:
-        logger.error(f"Chat endpoint error: {e}", exc_info=True)
+        logger.error("Chat endpoint error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to process chat request: {str(e)}"
         )
 
 
+@app.post("/api/v1/chat/batch", response_model=BatchChatResponse)
+async def chat_batch_endpoint(request: BatchChatRequest):
+    """
+    Batch chat endpoint for transcript replays and eval pipelines.
+
+    Processes every turn through the same per-turn pipeline as /chat, but
+    concurrently and within one HTTP request, amortizing connection and
+    routing overhead across N turns. The admission controller still caps
+    concurrent OpenAI calls, so a large batch queues instead of stampeding.
+
+    Args:
+        request: BatchChatRequest with a list of independent turns
+
+    Returns:
+        BatchChatResponse with one ChatResponse per turn, in order
+    """
+    try:
+        responses = await asyncio.gather(
+            *[chat_endpoint(turn) for turn in request.turns]
+        )
+        return BatchChatResponse(responses=list(responses))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Batch chat endpoint error: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to process chat batch: {str(e)}"
+        )
+
+
+def _sse_event(payload: dict) -> bytes:
+    """Serialize one server-sent event frame."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+async def _chat_event_stream(request: ChatRequest):
+    """
+    Async byte generator behind the streaming chat endpoint.
+
+    Q&A turns stream token deltas as they are decoded; collection turns
+    (and empty messages) are computed whole and emitted as a single final
+    event, so the client handles both phases through one protocol:
+    zero or more {"delta": ...} events, then {"done": true, "response": ...}.
+    """
+    try:
+        ud = request.user_data
+
+        if not request.message.strip():
+            missing = ud.get_missing_fields()
+            in_collection = bool(missing) or not ud.confirmed
+            response = ChatResponse(
+                response="",
+                phase="collection" if in_collection else "qa",
+                user_data=ud,
+                missing_fields=missing
+            )
+            yield _sse_event({"done": True, "response": response.model_dump()})
+            return
+
+        async with admission.slot():
+            missing_fields = ud.get_missing_fields()
+            is_complete = not missing_fields
+
+            if not is_complete or not ud.confirmed:
+                from services.collection_handler import handle_collection_phase
+
+                logger.info("→ Collection phase (stream wrapper)")
+                response = await handle_collection_phase(request)
+                yield _sse_event({"done": True, "response": response.model_dump()})
+
+            else:
+                from services.qa_handler import handle_qa_phase_stream
+
+                logger.info("→ Q&A phase (streaming): hmo=%s, tier=%s", ud.hmo, ud.tier)
+                async for event in handle_qa_phase_stream(request):
+                    yield _sse_event(event)
+
+    except Exception as e:
+        # Status/headers are already sent once streaming starts, so errors
+        # are reported in-band as a terminal event
+        logger.error("Streaming chat error: %s", e, exc_info=True)
+        yield _sse_event({"error": f"Failed to process chat request: {str(e)}"})
+
+
+@app.post("/api/v1/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Streaming chat endpoint (server-sent events).
+
+    Same contract as /api/v1/chat, but Q&A answers arrive as incremental
+    "data: {\"delta\": ...}" frames followed by a final frame with the
+    complete ChatResponse, cutting time-to-first-token from the full
+    generation latency to the first decoded chunk.
+    """
+    return StreamingResponse(
+        _chat_event_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Health probes fire every few seconds per pod; cache the timestamp with
+# 1s granularity instead of allocating a fresh datetime per probe.
+_ts_cache = {"t": 0.0, "dt": None}
+
+
+def _health_timestamp() -> datetime:
+    """Return a timezone-aware timestamp, refreshed at most once per second."""
+    now = time.time()
+    if now - _ts_cache["t"] > 1.0 or _ts_cache["dt"] is None:
+        _ts_cache["t"] = now
+        _ts_cache["dt"] = datetime.now(timezone.utc)
+    return _ts_cache["dt"]
+
+
 @app.get("/api/v1/health", response_model=HealthResponse)
-async def health_check():
+async def health_check(request: Request):
     """
     Health check endpoint for monitoring and orchestration.
 
@@ -184,8 +428,8 @@ async def health_check():
         HTTPException: If health check fails
     """
     try:
-        # Check vector store
-        vector_store = get_vector_store()
+        # Check vector store (initialized once in lifespan, read off app.state)
+        vector_store = request.app.state.vector_store
         vector_store_status = "connected" if vector_store.health_check() else "disconnected"
 
         # Overall status
@@ -193,7 +437,7 @@ async def health_check():
 
         return HealthResponse(
             status=overall_status,
-            timestamp=datetime.utcnow(),
+            timestamp=_health_timestamp(),
             components={
                 "vector_store": vector_store_status,
                 "azure_openai": "available"  # Checked implicitly during requests
@@ -201,7 +445,7 @@ async def health_check():
         )
 
     except Exception as e:
-        logger.error(f"Health check error: {e}", exc_info=True)
+        logger.error("Health check error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=503,
             detail=f"Health check failed: {str(e)}"
@@ -4,9 +4,159 @@ Pydantic models for Medical Chatbot API request/response validation.
 Defines all data structures for the stateless microservice architecture.
 """
 
-from pydantic import BaseModel, Field, field_validator, model_validator
+import functools
+import sys
+import unicodedata
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator, model_validator
 from typing import Optional, List, Dict, Any, Literal
-from datetime import datetime
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+from config import get_backend_settings
+
+
+@functools.lru_cache(maxsize=1)
+def _max_history() -> int:
+    """Resolve MAX_CONVERSATION_HISTORY once instead of on every request."""
+    return get_backend_settings().MAX_CONVERSATION_HISTORY
+
+
+# Normalization maps, built once at import time so validators don't
+# reallocate them on every request. MappingProxyType guards against
+# mutation; the canonical values are interned so every UserData in the
+# process shares one str object per value and equality checks become
+# pointer compares.
+_HMO_MAP = MappingProxyType({k: sys.intern(v) for k, v in {
+    "מכבי": "maccabi",
+    "maccabi": "maccabi",
+    "מאוחדת": "meuhedet",
+    "meuhedet": "meuhedet",
+    "כללית": "clalit",
+    "clalit": "clalit",
+}.items()})
+
+_TIER_MAP = MappingProxyType({k: sys.intern(v) for k, v in {
+    "זהב": "gold",
+    "gold": "gold",
+    "כסף": "silver",
+    "silver": "silver",
+    "ארד": "bronze",
+    "bronze": "bronze",
+}.items()})
+
+_GENDER_INTERNED = {g: sys.intern(g) for g in ("male", "female", "other")}
+
+
+def _nfc(s: str) -> str:
+    """NFC-normalize a string, skipping the O(n) pass when already normal.
+
+    Mixed NFC/NFD input (pasted Hebrew with niqqud, accented Latin names)
+    produces visually identical but unequal strings that defeat the prompt
+    caches and inflate token counts; canonicalizing once at the model
+    boundary means everything downstream sees one form. The quick-check
+    covers the common already-normal case.
+    """
+    if unicodedata.is_normalized("NFC", s):
+        return s
+    return unicodedata.normalize("NFC", s)
+
+
+# Canonicalization helpers for the UserData field validators. merged_with
+# reaches them through assignment validation, so merge and construction
+# apply identical rules.
+
+def _norm_hmo(v: str) -> str:
+    s = v.strip()
+    return _HMO_MAP.get(s, s.lower())
+
+
+def _norm_tier(v: str) -> str:
+    s = v.strip()
+    return _TIER_MAP.get(s, s.lower())
+
+
+def _norm_gender(v: str) -> str:
+    s = v.strip().lower()
+    return _GENDER_INTERNED.get(s, s)
+
+
+# Valid value sets for validate_field (interned frozensets, O(1) membership)
+_VALID_HMOS = frozenset({"maccabi", "meuhedet", "clalit"})
+_VALID_TIERS = frozenset({"gold", "silver", "bronze"})
+_VALID_GENDERS = frozenset({"male", "female", "other", "זכר", "נקבה", "אחר"})
+
+# Required UserData fields with their "is missing" predicate.
+# Age uses an explicit None check to preserve age 0 for infants.
+_REQUIRED = (
+    ("name", lambda u: not u.name),
+    ("id", lambda u: not u.id),
+    ("gender", lambda u: not u.gender),
+    ("age", lambda u: u.age is None),
+    ("hmo", lambda u: not u.hmo),
+    ("hmo_card", lambda u: not u.hmo_card),
+    ("tier", lambda u: not u.tier),
+)
+
+
+# Per-field validators for UserData.validate_field. Each takes the model
+# instance and returns (is_valid, error_message). Kept as free functions in
+# a dispatch dict so validation is one lookup instead of an if/elif chain.
+
+def _validate_id(u) -> tuple[bool, Optional[str]]:
+    if u.id:
+        if not u.id.isdigit():
+            return False, "ID must contain only digits"
+        if len(u.id) != 9:
+            return False, "ID must be exactly 9 digits"
+    return True, None
+
+
+def _validate_hmo_card(u) -> tuple[bool, Optional[str]]:
+    if u.hmo_card:
+        if not u.hmo_card.isdigit():
+            return False, "HMO card must contain only digits"
+        if len(u.hmo_card) != 9:
+            return False, "HMO card must be exactly 9 digits"
+    return True, None
+
+
+def _validate_age(u) -> tuple[bool, Optional[str]]:
+    if u.age is not None:
+        if u.age < 0 or u.age > 120:
+            return False, "Age must be between 0 and 120"
+    return True, None
+
+
+def _validate_hmo(u) -> tuple[bool, Optional[str]]:
+    if u.hmo and u.hmo.lower() not in _VALID_HMOS:
+        return False, "HMO must be one of: Maccabi, Meuhedet, Clalit"
+    return True, None
+
+
+def _validate_tier(u) -> tuple[bool, Optional[str]]:
+    if u.tier and u.tier.lower() not in _VALID_TIERS:
+        return False, "Tier must be one of: Gold, Silver, Bronze"
+    return True, None
+
+
+def _validate_gender(u) -> tuple[bool, Optional[str]]:
+    if u.gender and u.gender.lower() not in _VALID_GENDERS:
+        return False, "Gender must be one of: male, female, other"
+    return True, None
+
+
+# Field names whose mutation must invalidate the missing-fields memo
+_TRACKED_FIELDS = frozenset(name for name, _ in _REQUIRED)
+
+_FIELD_VALIDATORS = {
+    "id": _validate_id,
+    "hmo_card": _validate_hmo_card,
+    "age": _validate_age,
+    "hmo": _validate_hmo,
+    "tier": _validate_tier,
+    "gender": _validate_gender,
+}
 
 
 class UserData(BaseModel):
@@ -17,6 +167,11 @@ class UserData(BaseModel):
     The LLM handles validation conversationally during collection phase.
     """
 
+    # Whitespace stripping happens in pydantic-core (Rust) before any
+    # Python-level validator runs; assignment stays unvalidated (default)
+    # so the merge path isn't re-dispatching validators per field set.
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     name: Optional[str] = Field(None, description="First and last name")
     id: Optional[str] = Field(None, description="9-digit ID number")
     gender: Optional[str] = Field(None, description="Gender (male/female/other)")
@@ -26,22 +181,34 @@ class UserData(BaseModel):
     tier: Optional[str] = Field(None, description="Insurance tier: gold, silver, or bronze")
     confirmed: bool = Field(default=False, description="Whether user has confirmed their information")
 
+    # Memoized result of get_missing_fields. The handlers ask for missing
+    # fields several times per request on the same instance; __setattr__
+    # below drops the memo whenever a collected field is assigned, so
+    # direct mutation can't leave it stale. Stored as a tuple so callers
+    # can share (and hash) it without defensive copies.
+    _missing_cache: Optional[tuple] = PrivateAttr(default=None)
+
+    def __setattr__(self, name, value):
+        """Invalidate the missing-fields memo when a collected field mutates."""
+        super().__setattr__(name, value)
+        if name in _TRACKED_FIELDS:
+            self._missing_cache = None
+
+    @field_validator("name", "id", "gender", "hmo", "hmo_card", "tier", mode="before")
+    @classmethod
+    def normalize_unicode(cls, v):
+        """Canonicalize string fields to NFC before any other normalization."""
+        if isinstance(v, str):
+            return _nfc(v)
+        return v
+
     @field_validator("hmo")
     @classmethod
     def normalize_hmo(cls, v: Optional[str]) -> Optional[str]:
         """Normalize HMO to English (no validation errors)."""
         if v is None:
             return v
-        # Normalize to English for internal consistency
-        hmo_map = {
-            "מכבי": "maccabi",
-            "meuhedet": "meuhedet",
-            "מאוחדת": "meuhedet",
-            "כללית": "clalit",
-            "clalit": "clalit",
-            "maccabi": "maccabi"
-        }
-        return hmo_map.get(v.strip(), v.strip().lower())
+        return _norm_hmo(v)
 
     @field_validator("tier")
     @classmethod
@@ -49,16 +216,7 @@ class UserData(BaseModel):
         """Normalize tier to English (no validation errors)."""
         if v is None:
             return v
-        # Normalize to English for internal consistency
-        tier_map = {
-            "זהב": "gold",
-            "gold": "gold",
-            "כסף": "silver",
-            "silver": "silver",
-            "ארד": "bronze",
-            "bronze": "bronze"
-        }
-        return tier_map.get(v.strip(), v.strip().lower())
+        return _norm_tier(v)
 
     @field_validator("gender")
     @classmethod
@@ -66,91 +224,84 @@ class UserData(BaseModel):
         """Normalize gender to lowercase (no validation errors)."""
         if v is None:
             return v
-        return v.strip().lower()
+        return _norm_gender(v)
+
+    def merged_with(self, changes: Dict[str, Any], *, keep_none: bool = False) -> "UserData":
+        """
+        Return a copy with the non-null changes applied.
+
+        Each changed field goes through pydantic's assignment validation,
+        so it gets the same coercion and normalization the constructor
+        applies (e.g. "30" becomes age 30, and a value of the wrong type
+        raises ValidationError like the old dump-and-reconstruct cycle
+        did) - but unchanged fields carry over as-is instead of re-running
+        every validator on every field per merge.
+
+        Args:
+            changes: Field name -> new value; None values are skipped
+            keep_none: Apply None values instead of skipping them
+                (used when reverting a field to its previous empty state)
+
+        Raises:
+            ValidationError: If a changed value cannot be coerced to the
+                field's type
+        """
+        merged = self.model_copy()
+        validate_assignment = type(self).__pydantic_validator__.validate_assignment
+
+        for field, value in changes.items():
+            if value is None and not keep_none:
+                continue
+            validate_assignment(merged, field, value)
+
+        # Assignment validation writes past our __setattr__ hook, so drop
+        # the memo model_copy carried over explicitly
+        merged._missing_cache = None
+        return merged
+
+    def as_tuple(self) -> tuple:
+        """Hashable snapshot of the seven collected fields, in collection order.
+
+        Used as a cache key by the prompt builders: two UserData instances
+        with equal field values produce the same prompt.
+        """
+        return (self.name, self.id, self.gender, self.age, self.hmo, self.hmo_card, self.tier)
 
     def is_complete(self) -> bool:
-        """Check if all required fields are filled."""
-        return all([
-            self.name,
-            self.id,
-            self.gender,
-            self.age is not None,  # Preserve age 0 for infants
-            self.hmo,
-            self.hmo_card,
-            self.tier
-        ])
-
-    def get_missing_fields(self) -> List[str]:
-        """Get list of missing required fields."""
-        missing = []
-        if not self.name:
-            missing.append("name")
-        if not self.id:
-            missing.append("id")
-        if not self.gender:
-            missing.append("gender")
-        if self.age is None:  # Correctly handle age 0
-            missing.append("age")
-        if not self.hmo:
-            missing.append("hmo")
-        if not self.hmo_card:
-            missing.append("hmo_card")
-        if not self.tier:
-            missing.append("tier")
-        return missing
+        """Check if all required fields are filled (short-circuits on first missing)."""
+        if self._missing_cache is not None:
+            return not self._missing_cache
+        return not any(is_missing(self) for _, is_missing in _REQUIRED)
+
+    def get_missing_fields(self) -> tuple:
+        """Get tuple of missing required fields (memoized per instance)."""
+        if self._missing_cache is None:
+            self._missing_cache = tuple(name for name, is_missing in _REQUIRED if is_missing(self))
+        return self._missing_cache
 
     def validate_field(self, field_name: str) -> tuple[bool, Optional[str]]:
         """
         Validate a specific field and return (is_valid, error_message).
 
         This is used by the LLM during collection to provide conversational feedback.
+        Dispatches through _FIELD_VALIDATORS (O(1)) instead of an if/elif chain.
 
         Returns:
             Tuple of (is_valid, error_message). error_message is None if valid.
         """
-        if field_name == "id":
-            if self.id:
-                if not self.id.isdigit():
-                    return False, "ID must contain only digits"
-                if len(self.id) != 9:
-                    return False, "ID must be exactly 9 digits"
-
-        elif field_name == "hmo_card":
-            if self.hmo_card:
-                if not self.hmo_card.isdigit():
-                    return False, "HMO card must contain only digits"
-                if len(self.hmo_card) != 9:
-                    return False, "HMO card must be exactly 9 digits"
-
-        elif field_name == "age":
-            if self.age is not None:
-                if self.age < 0 or self.age > 120:
-                    return False, "Age must be between 0 and 120"
-
-        elif field_name == "hmo":
-            if self.hmo:
-                valid_hmos = {"maccabi", "meuhedet", "clalit"}
-                if self.hmo.lower() not in valid_hmos:
-                    return False, "HMO must be one of: Maccabi, Meuhedet, Clalit"
-
-        elif field_name == "tier":
-            if self.tier:
-                valid_tiers = {"gold", "silver", "bronze"}
-                if self.tier.lower() not in valid_tiers:
-                    return False, "Tier must be one of: Gold, Silver, Bronze"
-
-        elif field_name == "gender":
-            if self.gender:
-                valid_genders = {"male", "female", "other", "זכר", "נקבה", "אחר"}
-                if self.gender.lower() not in valid_genders:
-                    return False, "Gender must be one of: male, female, other"
-
-        return True, None
+        validator = _FIELD_VALIDATORS.get(field_name)
+        if validator is None:
+            return True, None
+        return validator(self)
 
 
 class Message(BaseModel):
     """Single message in conversation history."""
 
+    # Immutable record: frozen instances are hashable and cheaper to share
+    # across the per-request history copies; defer_build cuts import time.
+    model_config = ConfigDict(defer_build=True, frozen=True, extra="forbid")
+
     role: Literal["user", "assistant", "system"] = Field(..., description="Message role")
     content: str = Field(..., description="Message content")
 
@@ -177,12 +328,13 @@ class ChatRequest(BaseModel):
 
         Uses MAX_CONVERSATION_HISTORY from BackendSettings.
         """
-        from config import get_backend_settings
-
-        max_history = get_backend_settings().MAX_CONVERSATION_HISTORY
+        max_history = _max_history()
 
         if len(self.conversation_history) > max_history:
-            self.conversation_history = self.conversation_history[-max_history:]
+            # Delete in place instead of rebinding a sliced copy: avoids
+            # allocating a second list and re-triggering field assignment
+            # validation on the (potentially long) history.
+            del self.conversation_history[:-max_history]
 
         return self
 
@@ -190,6 +342,10 @@ class ChatRequest(BaseModel):
 class Source(BaseModel):
     """Source citation from RAG retrieval."""
 
+    # Immutable record built from our own pipeline; frozen + extra="forbid"
+    # keeps instances lean, defer_build cuts import time.
+    model_config = ConfigDict(defer_build=True, frozen=True, extra="forbid")
+
     type: str = Field(..., description="Chunk type: context, benefit, or contact")
     category: str = Field(..., description="Medical service category")
     service: Optional[str] = Field(None, description="Service name (for benefit chunks)")
@@ -226,11 +382,41 @@ class ChatResponse(BaseModel):
     )
 
 
+class BatchChatRequest(BaseModel):
+    """
+    Request model for the batch chat endpoint.
+
+    Carries several independent turns in one HTTP request - used by
+    transcript replays and eval pipelines, not the interactive UI.
+    """
+
+    # Only touched by offline tooling - skip eager schema build at import time
+    model_config = ConfigDict(defer_build=True)
+
+    turns: List[ChatRequest] = Field(..., description="Independent chat turns to process")
+
+
+class BatchChatResponse(BaseModel):
+    """Response model for the batch chat endpoint."""
+
+    model_config = ConfigDict(defer_build=True)
+
+    responses: List[ChatResponse] = Field(
+        ..., description="One response per input turn, in request order"
+    )
+
+
 class HealthResponse(BaseModel):
     """Response model for health check endpoint."""
 
+    # Only touched on health probes - skip eager schema build at import time
+    model_config = ConfigDict(defer_build=True)
+
     status: Literal["healthy", "degraded", "unhealthy"] = Field(..., description="Service health status")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Check timestamp")
+    timestamp: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Check timestamp"
+    )
     components: Dict[str, str] = Field(
         default_factory=dict,
         description="Status of individual components (vector_store, azure_openai, etc.)"
@@ -6,202 +6,218 @@ Two-step pattern:
 2. Generation: Friendly response based on validated data
 """
 
+import functools
+import operator
+import re
 import sys
 from pathlib import Path
-import json
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List, Any
 
 # Add parent directory to path for local development
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from models import UserData
 
+# Optional: only needed for client-side token counting/budgeting
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 
-# System prompt for collection phase
-COLLECTION_SYSTEM_PROMPT_HE = """## תפקיד:
-אתה רובוט איסוף מידע לשירותי בריאות. תפקידך הבלעדי והיחיד הוא לאסוף 7 שדות מידע מהמשתמש. אינך עונה על שאלות, אינך מספק מידע, ואינך מנהל שיחת חולין. אתה רק אוסף מידע.
-
-## מצב נוכחי ומה לאסוף:
-עליך לאסוף את 7 השדות הבאים בדיוק, אחד אחרי השני:
-1. **שם מלא** (פרטי ומשפחה)
-2. **מספר תעודת זהות** (בדיוק 9 ספרות)
-3. **מין** (זכר/נקבה/אחר)
-4. **גיל** (בין 0 ל-120)
-5. **קופת חולים** (מכבי/מאוחדת/כללית)
-6. **מספר כרטיס קופת חולים** (בדיוק 9 ספרות)
-7. **מסלול ביטוח** (זהב/כסף/ארד)
-
-## כללים קריטיים (עדיפות ראשונה):
-
-### כלל 1 - אכיפת שפה:
-אם המשתמש כותב באנגלית (Latin characters), עצור מיד ואמור בדיוק:
-"נראה שאתה כותב באנגלית. אנא לחץ על 'Start Over' בסרגל הצד ובחר English."
-אל תקבל את התשובה ואל תמשיך.
-
-### כלל 2 - מה מותר ומה אסור לענות (עדיפות שנייה):
-
-**מותר לענות רק על**:
-- שאלות הבהרה על השדה הנוכחי שאתה מבקש ממש עכשיו
-- דוגמאות:
-  * אתה שואל על tier → משתמש: "מה זה tier?" או "מה האפשרויות?" → [CORRECT] ענה: "Tier הוא מסלול הביטוח שלך. האפשרויות הן: זהב, כסף, או ארד. איזה tier יש לך?"
-  * אתה שואל על HMO card → משתמש: "מה זה מספר כרטיס?" → [CORRECT] ענה: "המספר בן 9 ספרות על כרטיס החבר שלך. מה המספר?"
-  * אתה שואל על HMO → משתמש: "מה זה קופת חולים?" או "מה האפשרויות?" או "איזה HMO זמין?" → [CORRECT] ענה: "קופת חולים היא הארגון שמספק לך שירותי בריאות. האפשרויות הן: מכבי, מאוחדת, או כללית. באיזו קופת חולים אתה מבוטח?"
-  * אתה שואל על מין → משתמש: "מה האפשרויות?" → [CORRECT] ענה: "האפשרויות הן: זכר, נקבה, או אחר. מה המין שלך?"
-
-**אסור לענות על**:
-- שאלות כלליות (האם העולם עגול? ספר לי על עטלפים?)
-- שאלות רפואיות לא קשורות לשדה הנוכחי (מה זה שיאצו? כמה עולה דיקור סיני?)
-- שיחת חולין (מה קורה אחי? מה נשמע?)
-- שאלות על שדות אחרים שלא מבקשים כרגע (אתה שואל על שם → משתמש: "מה ההבדל בין זהב לכסף?" → [REJECT] דחה)
-
-כשדוחה שאלה אסורה, אמור:
-"אני רובוט איסוף מידע בלבד. אני לא יכול לענות על שאלות כרגע. אוכל לעזור לך רק אחרי שנסיים את הרישום. בואו נמשיך - [שאל על השדה החסר]"
-
-דוגמאות לדחייה:
-- שאלה: "האם העולם עגול?" → "אני לא יכול לענות על שאלות כרגע. אוכל לעזור אחרי שנסיים את הרישום. מה שמך המלא?"
-- שאלה: "ספר לי על עטלפים" → "אני כאן רק לאסוף פרטים. לא אוכל לענות על זה כרגע. מה מספר תעודת הזהות שלך?"
-- שאלה: "מה קורה אחי?" → "אני רובוט איסוף מידע. בואו נמשיך - מה גילך?"
-- שאלה: "כמה עולה דיקור סיני?" (כשאתה שואל על שם) → "אענה על זה אחרי שנסיים את הרישום. כרגע, מה שמך המלא?"
-
-### כלל 3 - שאל שאלה אחת בכל פעם:
-אל תציף את המשתמש במספר שאלות בבת אחת. שאל רק על השדה החסר הבא.
-
-### כלל 4 - טיפול בתיקונים לאחר השלמת כל השדות:
-כאשר כל 7 השדות מלאים ואתה שואל אישור:
-- **אם המשתמש מתקן שדה** (קוראים לי X, השם שלי Y, גילי Z) → עדכן את השדה, הצג סיכום מעודכן, ושאל אישור שוב
-- **אל תכתוב COLLECTION_COMPLETE** עד שהמשתמש מאשר במפורש (כן/נכון/אישור)
-- **אם יש תיקון** → חזור למצב אישור, אל תעבור לשלב הבא
-
-דוגמאות:
-- אתה שואל אישור → משתמש: "קוראים לי חננה לבן" → עדכן שם ל"חננה לבן", הצג סיכום מעודכן, שאל: "האם כל הפרטים נכונים?"
-- אתה שואל אישור → משתמש: "גילי 40 ולא 35" → עדכן גיל ל-40, הצג סיכום, שאל אישור
-- אתה שואל אישור → משתמש: "כן" → כתוב "COLLECTION_COMPLETE"
-
-## כללי אימות (Validation Rules):
-- **מספר תעודת זהות**: בדיוק 9 ספרות, ללא אותיות או תווים מיוחדים
-- **מספר כרטיס קופת חולים**: בדיוק 9 ספרות, ללא אותיות או תווים מיוחדים
-- **גיל**: מספר בין 0 ל-120
-- **קופת חולים**: רק מכבי, מאוחדת או כללית
-- **מסלול**: רק זהב, כסף או ארד
-- **שם מלא**: חייב לכלול גם שם פרטי וגם משפחה
-
-## טיפול בשגיאות (Error Handling):
-כאשר המשתמש מספק נתונים לא תקינים, הסבר את הבעיה בצורה עדינה ובקש שוב:
-
-דוגמאות:
-- מספר ת"ז 8 ספרות: "מספר תעודת זהות חייב להכיל בדיוק 9 ספרות. מה מספר תעודת הזהות שלך?"
-- מספר ת"ז מכיל אותיות: "מספר תעודת זהות חייב להכיל רק ספרות. מה מספר תעודת הזהות שלך?"
-- קופת חולים לא תקינה: "אני יכול לעזור עם קופות החולים הבאות: מכבי, מאוחדת או כללית. באיזו קופת חולים אתה מבוטח?"
-
-## טון וכללי התנהגות (Tone and Conduct):
-- היה ידידותי אבל ממוקד - תפקידך הוא לאסוף מידע, לא לנהל שיחה
-- השתמש בשפה פשוטה וברורה
-- אל תמשיך לשדה הבא אם השדה הנוכחי לא תקין
-- הישאר בנימוס גם כשמשתמש שואל שאלות לא רלוונטיות - פשוט הפנה אותו חזרה למשימה
-
-## סיום איסוף המידע:
-לאחר שכל 7 השדות מלאים ותקינים:
-1. הצג סיכום של כל המידע שנאסף
-2. שאל: "האם כל הפרטים נכונים?"
-3. אם המשתמש מאשר, כתוב **בדיוק**: "COLLECTION_COMPLETE"
-4. אם המשתמש רוצה לתקן משהו, חזור לשדה הרלוונטי
-
-זכור: אתה רובוט איסוף מידע. לא עונה על שאלות אחרות עד שהמידע מלא."""
-
-COLLECTION_SYSTEM_PROMPT_EN = """## Role:
-You are an information collection bot for healthcare services. Your sole and only task is to collect 7 fields of information from the user. You do not answer questions, do not provide information, and do not engage in casual conversation. You only collect information.
-
-## Current State and What to Collect:
-You must collect the following 7 fields exactly, one after another:
-1. **Full name** (first and last)
-2. **ID number** (exactly 9 digits)
-3. **Gender** (male/female/other)
-4. **Age** (between 0 and 120)
-5. **HMO** (Maccabi/Meuhedet/Clalit)
-6. **HMO card number** (exactly 9 digits)
-7. **Insurance tier** (Gold/Silver/Bronze)
-
-## Critical Rules (First Priority):
-
-### Rule 1 - Language Enforcement:
-If the user writes in Hebrew (Hebrew characters), stop immediately and say exactly:
-"It looks like you're writing in Hebrew. Please click 'Start Over' in the sidebar and select עברית."
-Do not accept the answer and do not continue.
-
-### Rule 2 - What You Can and Cannot Answer (Second Priority):
-
-**You CAN answer only**:
-- Clarification questions about the current field you're asking for right now
-- Examples:
-  * You're asking for tier → User: "What is tier?" or "what are the options?" → [CORRECT] Answer: "Tier is your insurance plan level. The options are: Gold, Silver, or Bronze. Which tier do you have?"
-  * You're asking for HMO card → User: "What is card number?" → [CORRECT] Answer: "The 9-digit number on your HMO membership card. What's the number?"
-  * You're asking for HMO → User: "What is HMO?" or "what are the options?" or "what HMOs are available?" → [CORRECT] Answer: "HMO is the organization providing your healthcare services. The options are: Maccabi, Meuhedet, or Clalit. Which HMO are you with?"
-  * You're asking for gender → User: "what are the options?" → [CORRECT] Answer: "The options are: male, female, or other. What is your gender?"
-
-**You CANNOT answer**:
-- General questions (Is the Earth round? Tell me about bats?)
-- Medical questions unrelated to current field (What is shiatsu? How much does acupuncture cost?)
-- Casual chat (What's up? How are you?)
-- Questions about other fields you're not asking for now (You're asking for name → User: "What's the difference between gold and silver?" → [REJECT])
-
-When rejecting forbidden questions, say:
-"I'm an information collection bot only. I cannot answer questions right now. I can help you only after we finish registration. Let's continue - [ask for the missing field]"
-
-Rejection examples:
-- Question: "Is the Earth round?" → "I cannot answer questions right now. I can help after we finish registration. What is your full name?"
-- Question: "Tell me about bats" → "I'm here only to collect information. I cannot answer that right now. What is your ID number?"
-- Question: "What's up?" → "I'm an information collection bot. Let's continue - what is your age?"
-- Question: "How much does acupuncture cost?" (when asking for name) → "I'll answer that after we finish registration. Right now, what is your full name?"
-
-### Rule 3 - Ask One Question at a Time:
-Don't overwhelm the user with multiple questions at once. Ask only for the next missing field.
-
-### Rule 4 - Handling Corrections After All Fields Complete:
-When all 7 fields are complete and you're asking for confirmation:
-- **If user corrects a field** (my name is X, I'm actually Y, my age is Z) → Update the field, show updated summary, ask for confirmation again
-- **Do NOT write COLLECTION_COMPLETE** until user explicitly confirms (yes/correct/confirm/all correct)
-- **If there's a correction** → Return to confirmation mode, do not proceed to next phase
-
-Examples:
-- You ask for confirmation → User: "my name is Hannah Lev" → Update name to "Hannah Lev", show updated summary, ask: "Is all the information correct?"
-- You ask for confirmation → User: "I'm 40 not 35" → Update age to 40, show summary, ask for confirmation
-- You ask for confirmation → User: "yes" → Write "COLLECTION_COMPLETE"
-
-## Validation Rules:
-- **ID number**: exactly 9 digits, no letters or special characters
-- **HMO card number**: exactly 9 digits, no letters or special characters
-- **Age**: number between 0 and 120
-- **HMO**: only Maccabi, Meuhedet, or Clalit
-- **Tier**: only Gold, Silver, or Bronze
-- **Full name**: must include both first and last name
-
-## Error Handling:
-When the user provides invalid data, gently explain the issue and ask again:
-
-Examples:
-- ID is 8 digits: "ID number must contain exactly 9 digits. What is your ID number?"
-- ID contains letters: "ID number must contain only digits. What is your ID number?"
-- Invalid HMO: "I can help with the following HMOs: Maccabi, Meuhedet, or Clalit. Which HMO are you insured with?"
-
-## Tone and Conduct:
-- Be friendly but focused - your task is to collect information, not to chat
-- Use simple, clear language
-- Don't move to the next field if the current field is invalid
-- Stay polite even when users ask irrelevant questions - simply redirect them back to the task
-
-## Completing Collection:
-After all 7 fields are complete and valid:
-1. Show a summary of all collected information
-2. Ask: "Is all the information correct?"
-3. If the user confirms, write **exactly**: "COLLECTION_COMPLETE"
-4. If the user wants to correct something, return to the relevant field
-
-Remember: You are an information collection bot. Do not answer other questions until the information is complete."""
+
+# The multi-kilobyte system prompts live as plain-text resources next to
+# this module; keeping them out of the source shrinks the .pyc and speeds
+# up module parse/import on cold starts. The cached loader reads each file
+# once per process.
+_RESOURCES = Path(__file__).parent / "resources"
+
+
+@functools.cache
+def _load_resource(name: str) -> str:
+    """Read a prompt resource file once; cached for the process lifetime."""
+    return (_RESOURCES / name).read_text(encoding="utf-8")
+
+
+COLLECTION_SYSTEM_PROMPT_HE = _load_resource("collection_system_he.txt")
+COLLECTION_SYSTEM_PROMPT_EN = _load_resource("collection_system_en.txt")
+
+
+# Language-keyed tables driving a single prompt-assembly code path.
+# Deduplicating the HE/EN branches halves the builder code and guarantees
+# both languages emit structurally identical prompts.
+
+# Field display labels, in collection order (mirrors UserData's fields)
+_FIELD_LABELS = {
+    "he": ("שם", "ת.ז", "מין", "גיל", "קופת חולים", "כרטיס קופת חולים", "מסלול"),
+    "en": ("Name", "ID", "Gender", "Age", "HMO", "HMO card", "Tier"),
+}
+
+# Single C-level fetch of the seven collected fields, in label order.
+# attrgetter returns a ready-made tuple, so the wrappers can unpack it
+# straight into the cached builders without an intermediate dict.
+_GET_FIELDS = operator.attrgetter("name", "id", "gender", "age", "hmo", "hmo_card", "tier")
+
+# Compact per-turn prompt: only one field is active at a time, so most
+# turns need a small shared preamble plus the rules for that field, not
+# the full 4KB system prompt. The full prompt is kept for the
+# confirmation phase, where all fields are in play.
+_PREAMBLE = {
+    "he": (
+        "## תפקיד:\n"
+        "אתה רובוט איסוף מידע לשירותי בריאות. אסוף 7 שדות: שם מלא, ת.ז, מין, "
+        "גיל, קופת חולים, כרטיס קופת חולים, מסלול ביטוח.\n"
+        "שאל שאלה אחת בכל פעם, רק על השדה הפעיל. ענה רק על שאלות הבהרה על "
+        "השדה הפעיל; כל שאלה אחרת - דחה בנימוס והפנה חזרה לשדה החסר.\n"
+        "אם ערך לא תקין, הסבר בעדינות ובקש שוב.\n"
+    ),
+    "en": (
+        "## Role:\n"
+        "You are an information collection bot for healthcare services. Collect 7 "
+        "fields: full name, ID, gender, age, HMO, HMO card, insurance tier.\n"
+        "Ask one question at a time, only about the active field. Answer only "
+        "clarification questions about the active field; politely reject anything "
+        "else and redirect to the missing field.\n"
+        "If a value is invalid, gently explain and ask again.\n"
+    ),
+}
+
+_FIELD_RULES = {
+    "name": {
+        "he": "## השדה הפעיל - שם מלא:\nחייב לכלול שם פרטי ושם משפחה.\n",
+        "en": "## Active Field - Full Name:\nMust include both first and last name.\n",
+    },
+    "id": {
+        "he": "## השדה הפעיל - מספר תעודת זהות:\nבדיוק 9 ספרות, ללא אותיות או תווים מיוחדים.\n",
+        "en": "## Active Field - ID Number:\nExactly 9 digits, no letters or special characters.\n",
+    },
+    "gender": {
+        "he": "## השדה הפעיל - מין:\nהאפשרויות: זכר, נקבה, או אחר.\n",
+        "en": "## Active Field - Gender:\nOptions: male, female, or other.\n",
+    },
+    "age": {
+        "he": "## השדה הפעיל - גיל:\nמספר בין 0 ל-120.\n",
+        "en": "## Active Field - Age:\nA number between 0 and 120.\n",
+    },
+    "hmo": {
+        "he": "## השדה הפעיל - קופת חולים:\nהאפשרויות: מכבי, מאוחדת, או כללית.\n",
+        "en": "## Active Field - HMO:\nOptions: Maccabi, Meuhedet, or Clalit.\n",
+    },
+    "hmo_card": {
+        "he": "## השדה הפעיל - כרטיס קופת חולים:\nהמספר בן 9 הספרות על כרטיס החבר, ללא אותיות.\n",
+        "en": "## Active Field - HMO Card:\nThe 9-digit number on the membership card, digits only.\n",
+    },
+    "tier": {
+        "he": "## השדה הפעיל - מסלול ביטוח:\nהאפשרויות: זהב, כסף, או ארד.\n",
+        "en": "## Active Field - Insurance Tier:\nOptions: Gold, Silver, or Bronze.\n",
+    },
+}
+
+
+# One tuple per language: (base prompt, status header, collected-counter
+# format, missing-fields format, all-collected line). A single dict lookup
+# plus tuple unpack replaces several per-call lookups in the hot builder.
+_COLLECTION_BASES = {
+    "he": (
+        COLLECTION_SYSTEM_PROMPT_HE,
+        "\n\n## סטטוס נוכחי:\n",
+        "שדות שנאספו: {}/7\n",
+        "שדות חסרים: {}\n",
+        "כל השדות נאספו! הצג סיכום ובקש אישור.\n",
+    ),
+    "en": (
+        COLLECTION_SYSTEM_PROMPT_EN,
+        "\n\n## Current Status:\n",
+        "Fields collected: {}/7\n",
+        "Missing fields: {}\n",
+        "All fields collected! Show summary and ask for confirmation.\n",
+    ),
+}
+
+
+# Pre-encoded UTF-8 forms of the base prompts. The Hebrew prompt is
+# multi-byte-heavy, so re-encoding ~4KB of static text per request is
+# measurable; callers whose HTTP client accepts bytes content can use
+# build_collection_prompt_bytes and only pay to encode the status tail.
+COLLECTION_SYSTEM_PROMPT_HE_BYTES = COLLECTION_SYSTEM_PROMPT_HE.encode("utf-8")
+COLLECTION_SYSTEM_PROMPT_EN_BYTES = COLLECTION_SYSTEM_PROMPT_EN.encode("utf-8")
+
+
+def build_collection_prompt_bytes(user_data: UserData, language: str = "he") -> bytes:
+    """
+    UTF-8 encoded variant of build_collection_prompt.
+
+    The static base prompt is taken from the pre-encoded constants; only
+    the per-turn status tail is encoded on each call.
+
+    Args:
+        user_data: Current user data (may be partial)
+        language: Conversation language ("he" or "en")
+
+    Returns:
+        Full system prompt as UTF-8 bytes
+    """
+    if language == "he":
+        base, base_bytes = COLLECTION_SYSTEM_PROMPT_HE, COLLECTION_SYSTEM_PROMPT_HE_BYTES
+    else:
+        base, base_bytes = COLLECTION_SYSTEM_PROMPT_EN, COLLECTION_SYSTEM_PROMPT_EN_BYTES
+
+    full = build_collection_prompt(user_data, language)
+    if full.startswith(base):
+        return b"".join((base_bytes, full[len(base):].encode("utf-8")))
+    # Compact active-field prompts don't share the static base prefix
+    return full.encode("utf-8")
+
+
+@functools.cache
+def _encoding():
+    """Resolve the GPT-4o tiktoken encoding once per process."""
+    if tiktoken is None:
+        raise RuntimeError("tiktoken is not installed; token-ID helpers are unavailable")
+    return tiktoken.encoding_for_model("gpt-4o")
+
+
+@functools.cache
+def _base_prompt_ids(language: str) -> Tuple[int, ...]:
+    """Token IDs of the static base prompt, computed once per language."""
+    base = COLLECTION_SYSTEM_PROMPT_HE if language == "he" else COLLECTION_SYSTEM_PROMPT_EN
+    return tuple(_encoding().encode(base))
+
+
+def build_collection_prompt_ids(user_data: UserData, language: str = "he") -> List[int]:
+    """
+    Token IDs of the full collection prompt, for counting and budgeting.
+
+    The static base prompt is tokenized once per process; each call only
+    tokenizes the per-turn tail, which makes repeated budget checks cheap.
+
+    Args:
+        user_data: Current user data (may be partial)
+        language: Conversation language ("he" or "en")
+
+    Returns:
+        List of token IDs for the full prompt
+
+    Raises:
+        RuntimeError: If tiktoken is not installed
+    """
+    base = COLLECTION_SYSTEM_PROMPT_HE if language == "he" else COLLECTION_SYSTEM_PROMPT_EN
+    full = build_collection_prompt(user_data, language)
+    if full.startswith(base):
+        return list(_base_prompt_ids(language)) + _encoding().encode(full[len(base):])
+    # Compact active-field prompts don't share the static base prefix
+    return _encoding().encode(full)
 
 
 def build_collection_prompt(user_data: UserData, language: str = "he") -> str:
     """
     Build the collection system prompt with current user data status.
 
+    The heavy string assembly is delegated to an lru_cache'd helper keyed
+    on the scalar field values: user data changes one field at a time, so
+    retries and corrections within a conversation hit the cache.
+
+    Pure function (no I/O): cache hits return in about a microsecond, so
+    it is safe to call inline from async handlers without to_thread.
+
     Args:
         user_data: Current user data (may be partial)
         language: Conversation language ("he" or "en")
@@ -209,265 +225,514 @@ def build_collection_prompt(user_data: UserData, language: str = "he") -> str:
     Returns:
         System prompt string with data status
     """
-    # Base prompt based on language
-    if language == "he":
-        base_prompt = COLLECTION_SYSTEM_PROMPT_HE
+    return _build_collection_prompt_cached(
+        language,
+        *_GET_FIELDS(user_data),
+        user_data.get_missing_fields(),
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _build_collection_prompt_cached(
+    language: str,
+    name: Optional[str],
+    id_: Optional[str],
+    gender: Optional[str],
+    age: Optional[int],
+    hmo: Optional[str],
+    hmo_card: Optional[str],
+    tier: Optional[str],
+    missing_fields: Tuple[str, ...],
+) -> str:
+    """Assemble the collection prompt from hashable scalars (cache-friendly)."""
+    lang = "he" if language == "he" else "en"
+    base, status_hdr, counter_fmt, missing_fmt, complete_line = _COLLECTION_BASES[lang]
+
+    # While collecting, ship the compact preamble plus the active field's
+    # rules (~800B) instead of the full base prompt (~4KB); the full
+    # prompt is only needed at the confirmation phase.
+    if missing_fields:
+        base = _PREAMBLE[lang] + _FIELD_RULES[missing_fields[0]][lang]
+
+    # Accumulate into a list and join once: repeated += on str reallocates
+    # the whole buffer per line, a join is a single allocation.
+    parts = [base, status_hdr, counter_fmt.format(7 - len(missing_fields))]
+
+    if missing_fields:
+        parts.append(missing_fmt.format(", ".join(missing_fields)))
     else:
-        base_prompt = COLLECTION_SYSTEM_PROMPT_EN
+        parts.append(complete_line)
+
+    # Show collected data (age 0 is valid, hence the explicit None/"" check)
+    for label, value in zip(_FIELD_LABELS[lang], (name, id_, gender, age, hmo, hmo_card, tier)):
+        if value is not None and value != "":
+            parts.append(f"- {label}: {value}\n")
+
+    return "".join(parts)
+
+
+# STEP 1: Extraction - structure is enforced by the JSON schema below via
+# the provider's constrained decoding, so the prompt only needs to explain
+# context handling and normalization, not teach the output shape by example.
+EXTRACTION_PROMPT = """Extract user registration fields from the conversation.
+
+Use the last 2-3 turns for context: if the bot asked "How old are you?" and the user said "30", that 30 is the age.
+
+Normalization:
+- HMO, tier, gender → lowercase English ("מכבי" → "maccabi", "זהב" → "gold", "זכר" → "male")
+- ID / HMO card → digits only, strip spaces and dashes
+- Name → as provided, properly capitalized
+
+Fill only fields the user mentioned in this turn or recent context; set everything else to null.
+
+Keys: name(str), id(str), gender(male|female|other), age(int 0-120), hmo(maccabi|meuhedet|clalit), hmo_card(str), tier(gold|silver|bronze) - each nullable."""
+
+
+# JSON schema matching UserData's collectible fields. Attached to the
+# extraction call as a constrained response_format: the decoder can only
+# emit this shape, which replaces the old few-shot examples and removes
+# the malformed-JSON retry path.
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": ["string", "null"]},
+        "id": {"type": ["string", "null"]},
+        "gender": {"enum": ["male", "female", "other", None]},
+        "age": {"type": ["integer", "null"], "minimum": 0, "maximum": 120},
+        "hmo": {"enum": ["maccabi", "meuhedet", "clalit", None]},
+        "hmo_card": {"type": ["string", "null"]},
+        "tier": {"enum": ["gold", "silver", "bronze", None]},
+    },
+    "required": ["name", "id", "gender", "age", "hmo", "hmo_card", "tier"],
+    "additionalProperties": False,
+}
 
-    # Add current status
-    missing_fields = user_data.get_missing_fields()
+# Envelope for the fused extraction+reply call. Nesting EXTRACTION_SCHEMA
+# keeps the same type guarantees as two-step extraction (e.g. age is an
+# integer, never "30"), so the merge path downstream sees identical input
+# from either path.
+FUSED_COLLECTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "extracted": EXTRACTION_SCHEMA,
+        "reply": {"type": "string"},
+    },
+    "required": ["extracted", "reply"],
+    "additionalProperties": False,
+}
 
-    if language == "he":
-        status = "\n\n## סטטוס נוכחי:\n"
-        status += f"שדות שנאספו: {7 - len(missing_fields)}/7\n"
-
-        if missing_fields:
-            status += f"שדות חסרים: {', '.join(missing_fields)}\n"
-        else:
-            status += "כל השדות נאספו! הצג סיכום ובקש אישור.\n"
-
-        # Show collected data
-        if user_data.name:
-            status += f"- שם: {user_data.name}\n"
-        if user_data.id:
-            status += f"- ת.ז: {user_data.id}\n"
-        if user_data.gender:
-            status += f"- מין: {user_data.gender}\n"
-        if user_data.age is not None:
-            status += f"- גיל: {user_data.age}\n"
-        if user_data.hmo:
-            status += f"- קופת חולים: {user_data.hmo}\n"
-        if user_data.hmo_card:
-            status += f"- כרטיס קופת חולים: {user_data.hmo_card}\n"
-        if user_data.tier:
-            status += f"- מסלול: {user_data.tier}\n"
 
-    else:
-        status = "\n\n## Current Status:\n"
-        status += f"Fields collected: {7 - len(missing_fields)}/7\n"
-
-        if missing_fields:
-            status += f"Missing fields: {', '.join(missing_fields)}\n"
-        else:
-            status += "All fields collected! Show summary and ask for confirmation.\n"
-
-        # Show collected data
-        if user_data.name:
-            status += f"- Name: {user_data.name}\n"
-        if user_data.id:
-            status += f"- ID: {user_data.id}\n"
-        if user_data.gender:
-            status += f"- Gender: {user_data.gender}\n"
-        if user_data.age is not None:
-            status += f"- Age: {user_data.age}\n"
-        if user_data.hmo:
-            status += f"- HMO: {user_data.hmo}\n"
-        if user_data.hmo_card:
-            status += f"- HMO card: {user_data.hmo_card}\n"
-        if user_data.tier:
-            status += f"- Tier: {user_data.tier}\n"
-
-    return base_prompt + status
-
-
-# STEP 1: Extraction Prompt (JSON output only)
-EXTRACTION_PROMPT = """Extract and normalize user information from the conversation and output ONLY valid JSON.
-
-**IMPORTANT**: Analyze the last 2-3 turns of conversation for context. If the bot asked "How old are you?" and user said "30", understand that 30 refers to age.
-
-Output format (include only fields mentioned):
-{
-  "name": "string or null",
-  "id": "string or null",
-  "gender": "string or null",
-  "age": number or null,
-  "hmo": "string or null",
-  "hmo_card": "string or null",
-  "tier": "string or null"
+def build_streaming_extraction_target(asked_field: str) -> str:
+    """
+    JSON key prefix marking the asked-for field in a streamed extraction.
+
+    A streaming consumer can stop reading the completion once this prefix
+    and the following value delimiter have arrived - with the constrained
+    extraction schema every other field is null, so nothing after the
+    asked-for field carries information.
+
+    Args:
+        asked_field: Name of the field the bot is currently asking for
+
+    Returns:
+        The key prefix to scan for in the token stream
+    """
+    return f'"{asked_field}":'
+
+
+# Local fast-path extraction. When the user directly answers the field the
+# bot just asked for ("123456789", "מכבי", "gold"), a compiled regex match
+# is enough - no need for an LLM extraction round-trip. Ambiguous input
+# falls through (empty dict) to the LLM extractor.
+_ID_RE = re.compile(r"(?<!\d)(\d[\d\s\-]{7,}\d)(?!\d)")
+_HMO_RE = re.compile(r"(מכבי|מאוחדת|כללית|maccabi|meuhedet|clalit)", re.IGNORECASE)
+_TIER_RE = re.compile(r"(זהב|כסף|ארד|gold|silver|bronze)", re.IGNORECASE)
+_GENDER_RE = re.compile(r"(זכר|נקבה|אחר|female|male|other)", re.IGNORECASE)
+_AGE_RE = re.compile(r"(?<!\d)(\d{1,3})(?!\d)")
+
+# Canonical values interned to share one str object per value with the
+# normalization maps in models.py (pointer-fast comparisons downstream)
+_HMO_NORMALIZE = {k: sys.intern(v) for k, v in {
+    "מכבי": "maccabi", "maccabi": "maccabi",
+    "מאוחדת": "meuhedet", "meuhedet": "meuhedet",
+    "כללית": "clalit", "clalit": "clalit",
+}.items()}
+_TIER_NORMALIZE = {k: sys.intern(v) for k, v in {
+    "זהב": "gold", "gold": "gold",
+    "כסף": "silver", "silver": "silver",
+    "ארד": "bronze", "bronze": "bronze",
+}.items()}
+_GENDER_NORMALIZE = {k: sys.intern(v) for k, v in {
+    "זכר": "male", "male": "male",
+    "נקבה": "female", "female": "female",
+    "אחר": "other", "other": "other",
+}.items()}
+
+
+def fast_extract(user_message: str, asked_field: Optional[str]) -> Dict[str, Any]:
+    """
+    Cheap regex extraction for direct answers to the field just asked for.
+
+    Returns a single-field dict when the message confidently contains a
+    value for asked_field, or an empty dict to fall back to LLM extraction.
+    Names are never fast-extracted (too ambiguous).
+
+    Args:
+        user_message: Current user message
+        asked_field: Name of the field the bot is currently asking for
+
+    Returns:
+        {asked_field: normalized_value} on a confident match, else {}
+    """
+    if not asked_field:
+        return {}
+
+    text = user_message.strip()
+
+    if asked_field in ("id", "hmo_card"):
+        match = _ID_RE.search(text)
+        if match:
+            digits = re.sub(r"\D", "", match.group(1))
+            if len(digits) == 9:
+                return {asked_field: digits}
+
+    elif asked_field == "age":
+        match = _AGE_RE.search(text)
+        # Require a short message so "I was born in 1990" isn't taken as age
+        if match and len(text) <= 20:
+            age = int(match.group(1))
+            if 0 <= age <= 120:
+                return {"age": age}
+
+    elif asked_field == "hmo":
+        match = _HMO_RE.search(text)
+        if match:
+            return {"hmo": _HMO_NORMALIZE[match.group(1).lower()]}
+
+    elif asked_field == "tier":
+        match = _TIER_RE.search(text)
+        if match:
+            return {"tier": _TIER_NORMALIZE[match.group(1).lower()]}
+
+    elif asked_field == "gender":
+        match = _GENDER_RE.search(text)
+        if match:
+            return {"gender": _GENDER_NORMALIZE[match.group(1).lower()]}
+
+    return {}
+
+
+# Language enforcement in Python. Whether a message is Hebrew or English
+# is a Unicode-range check, not something the LLM should burn tokens on;
+# the orchestrator short-circuits wrong-language turns with these canned
+# redirects and never calls the model.
+LANGUAGE_REDIRECTS = {
+    "he": "נראה שאתה כותב באנגלית. אנא לחץ על 'Start Over' בסרגל הצד ובחר English.",
+    "en": "It looks like you're writing in Hebrew. Please click 'Start Over' in the sidebar and select עברית.",
+}
+
+_HEBREW_START, _HEBREW_END = 0x0590, 0x05FF
+
+
+def detect_script(text: str) -> str:
+    """
+    Detect the script of a message: "he", "en" or "mixed".
+
+    Args:
+        text: The user's message
+
+    Returns:
+        "he" if only Hebrew letters appear, "en" if only Latin letters,
+        "mixed" for both, neither (digits/punctuation), or empty input
+    """
+    has_hebrew = False
+    has_latin = False
+    for ch in text:
+        if _HEBREW_START <= ord(ch) <= _HEBREW_END:
+            has_hebrew = True
+        elif ch.isascii() and ch.isalpha():
+            has_latin = True
+        if has_hebrew and has_latin:
+            return "mixed"
+    if has_hebrew:
+        return "he"
+    if has_latin:
+        return "en"
+    return "mixed"
+
+
+# Deterministic classification of the user's turn at the confirmation
+# stage. Whether a message is a confirmation, a question or a correction
+# is a keyword decision; doing it in Python lets the generation step ship
+# a one-line instruction instead of the full correction-detection rules.
+_CONFIRM_WORDS = {
+    "he": frozenset({"כן", "נכון", "אישור", "בסדר", "מאשר", "הכל נכון", "כן נכון"}),
+    "en": frozenset({"yes", "correct", "confirm", "ok", "okay", "yep", "all correct", "yes correct"}),
+}
+
+_QUESTION_WORDS = {
+    "he": ("מה", "למה", "איך", "מתי", "כמה", "האם"),
+    "en": ("what", "why", "how", "when", "which", "is", "are", "can"),
 }
 
-Normalization Rules:
-- **HMO**: Normalize to lowercase English: "Maccabi"/"מכבי" → "maccabi", "Meuhedet"/"מאוחדת" → "meuhedet", "Clalit"/"כללית" → "clalit"
-- **Tier**: Normalize to lowercase English: "Gold"/"זהב" → "gold", "Silver"/"כסף" → "silver", "Bronze"/"ארד" → "bronze"
-- **Gender**: Normalize to lowercase English: "Male"/"זכר" → "male", "Female"/"נקבה" → "female", "Other"/"אחר" → "other"
-- **ID/HMO card**: Extract only digits, remove spaces/dashes
-- **Age**: Extract number only
-- **Name**: Keep as provided (capitalized properly)
 
-Only include fields that the user explicitly mentioned in this turn or recent context.
-Return null for fields not mentioned.
-Output ONLY the JSON object, no explanation.
+def classify_confirmation_turn(text: str, language: str = "he") -> str:
+    """
+    Classify a confirmation-stage turn as "confirm", "question" or "correction".
+
+    Args:
+        text: The user's message
+        language: Conversation language ("he" or "en")
+
+    Returns:
+        "confirm" for explicit approval, "question" for questions,
+        "correction" for anything else (including field corrections)
+    """
+    lang = "he" if language == "he" else "en"
+    stripped = text.strip().lower().rstrip("!. ")
+
+    if not stripped:
+        return "correction"
+    if stripped in _CONFIRM_WORDS[lang]:
+        return "confirm"
+    if "?" in text or stripped.split()[0] in _QUESTION_WORDS[lang]:
+        return "question"
+    return "correction"
+
+
+def is_extraction_noop(text: str, language: str = "he") -> bool:
+    """
+    True when the message cannot contain new profile fields.
+
+    A bare confirmation ("yes", "כן") or a message under two characters
+    has nothing to extract, so the caller can skip the extraction LLM
+    call entirely.
 
-Examples:
-User: "My name is Ron Isakov"
-Output: {"name": "Ron Isakov", "id": null, "gender": null, "age": null, "hmo": null, "hmo_card": null, "tier": null}
+    Args:
+        text: The user's message
+        language: Conversation language ("he" or "en")
+
+    Returns:
+        True if extraction should be skipped for this message
+    """
+    lang = "he" if language == "he" else "en"
+    stripped = text.strip().lower().rstrip("!. ")
+    return len(stripped) < 2 or stripped in _CONFIRM_WORDS[lang]
 
-Bot: "How old are you?"
-User: "30"
-Output: {"name": null, "id": null, "gender": null, "age": 30, "hmo": null, "hmo_card": null, "tier": null}
 
-User: "I'm with מכבי זהב"
-Output: {"name": null, "id": null, "gender": null, "age": null, "hmo": "maccabi", "hmo_card": null, "tier": "gold"}
+# Base role prompt for Step 2 (generation), per language (see _RESOURCES)
+_GENERATION_BASE = {
+    "he": _load_resource("generation_base_he.txt"),
+    "en": _load_resource("generation_base_en.txt"),
+}
 
-User: "My ID is 123-456-789"
-Output: {"name": null, "id": "123456789", "gender": null, "age": null, "hmo": null, "hmo_card": null, "tier": null}"""
+# Per-language instruction strings for the generation prompt tail
+_GENERATION_STRINGS = {
+    "he": {
+        "errors_header": "\n## שגיאות אימות:\n",
+        "fix_errors": "\n**הוראות**: הסבר בעדינות את כל הבעיות ובקש את השדות שוב.\n",
+        "ask_missing": "\n**הוראות**: שאל על השדה החסר הבא: {}\n",
+        "fused_reply": (
+            "\n**הוראות**: תחילה החל את הערכים שחילצת במשימה 1 על הפרטים שנאספו לעיל. "
+            "לאחר מכן שאל על השדה הראשון שעדיין חסר, לפי הסדר הזה: "
+            "שם, ת.ז, מין, גיל, קופת חולים, מספר כרטיס קופה, מסלול ביטוח. "
+            "אל תשאל שוב על שדה שהמשתמש מסר זה עתה. "
+            "אם אף שדה לא חסר, הצג את כל 7 השדות ובקש מהמשתמש לאשר אותם; "
+            "רק לאחר אישור מפורש כתוב בדיוק 'COLLECTION_COMPLETE'.\n"
+        ),
+        "confirm_turn": "\n**הוראות**: המשתמש אישר את הפרטים. כתוב בדיוק 'COLLECTION_COMPLETE'.\n",
+        "question_turn": (
+            "\n**הוראות**: המשתמש שאל שאלה. ענה: \"אני רובוט איסוף מידע בלבד "
+            "ולא יכול לענות על שאלות ברגע זה. נא לאשר את הפרטים או לתקן אם יש טעות.\"\n"
+        ),
+        "confirmation": (
+            "\n**הוראות קריטיות - יש לבצע בדיוק לפי הסדר הזה**:\n\n"
+            "**שלב 1 - הצג את הסיכום המלא**:\n"
+            "הצג את כל 7 השדות (שם, ת.ז, מין, גיל, קופת חולים, כרטיס, מסלול) ושאל: \"האם כל הפרטים נכונים?\"\n\n"
+            "**שלב 2 - נתח את תשובת המשתמש בדיוק**:\n"
+            "א. **אם המשתמש אומר**: \"כן\", \"נכון\", \"אישור\", \"בסדר\", \"correct\", \"yes\" → כתוב בדיוק 'COLLECTION_COMPLETE' בתשובה\n\n"
+            "ב. **אם המשתמש כותב ערך של שדה** (ללא שאלה) → זהו תיקון!\n"
+            "   דוגמאות לתיקון:\n"
+            "   - \"מסלול כסף\" → עדכן tier ל-silver\n"
+            "   - \"מסלול ארד\" → עדכן tier ל-bronze\n"
+            "   - \"גילי 40\" → עדכן age ל-40\n"
+            "   - \"קוראים לי דוד\" → עדכן name ל-דוד\n"
+            "   - \"זכר\" → עדכן gender ל-male\n"
+            "   - \"מכבי\" → עדכן hmo ל-maccabi\n"
+            "   כיצד לזהות תיקון: אם המשתמש כותב רק שם שדה + ערך (למשל \"מסלול כסף\") או רק ערך (\"כסף\") → זהו תיקון!\n"
+            "   **פעולה**: עדכן את השדה המתאים, הצג סיכום מעודכן, וחזור לשלב 1 (שאל \"האם כל הפרטים נכונים?\" שוב)\n\n"
+            "ג. **אם המשתמש שואל שאלה** (יש סימן שאלה או מילת שאלה כמו \"מה\", \"למה\", \"איך\") → סרב!\n"
+            "   \"אני רובוט איסוף מידע בלבד ולא יכול לענות על שאלות ברגע זה. נא לאשר את הפרטים או לתקן אם יש טעות.\"\n\n"
+            "**זכור**: אל תכתוב 'COLLECTION_COMPLETE' אם המשתמש תיקן שדה! חזור לשלב 1 ושאל אישור שוב.\n"
+        ),
+    },
+    "en": {
+        "errors_header": "\n## Validation Errors:\n",
+        "fix_errors": "\n**Instructions**: Gently explain all issues and ask for the fields again.\n",
+        "ask_missing": "\n**Instructions**: Ask for the next missing field: {}\n",
+        "fused_reply": (
+            "\n**Instructions**: First apply the values you just extracted in Task 1 "
+            "to the collected data above. Then ask for the first field that is still "
+            "missing, in this order: name, ID number, gender, age, HMO, HMO card "
+            "number, insurance tier. Never re-ask for a field the user just provided. "
+            "If no field is missing, display all 7 fields and ask the user to confirm "
+            "them; only after an explicit confirmation write exactly "
+            "'COLLECTION_COMPLETE'.\n"
+        ),
+        "confirm_turn": "\n**Instructions**: The user confirmed the details. Write exactly 'COLLECTION_COMPLETE'.\n",
+        "question_turn": (
+            "\n**Instructions**: The user asked a question. Reply: \"I'm an information "
+            "collection bot only and cannot answer questions right now. Please confirm "
+            "the details or correct if there's an error.\"\n"
+        ),
+        "confirmation": (
+            "\n**Critical Instructions - Follow This Exact Order**:\n\n"
+            "**Step 1 - Show Complete Summary**:\n"
+            "Display all 7 fields (name, ID, gender, age, HMO, card, tier) and ask: \"Is all the information correct?\"\n\n"
+            "**Step 2 - Analyze User Response Precisely**:\n"
+            "a. **If user says**: \"yes\", \"correct\", \"confirm\", \"ok\" → Write exactly 'COLLECTION_COMPLETE' in response\n\n"
+            "b. **If user writes a field value** (without a question) → This is a correction!\n"
+            "   Examples of corrections:\n"
+            "   - \"tier silver\" → update tier to silver\n"
+            "   - \"tier bronze\" → update tier to bronze\n"
+            "   - \"age 40\" → update age to 40\n"
+            "   - \"my name is David\" → update name to David\n"
+            "   - \"male\" → update gender to male\n"
+            "   - \"maccabi\" → update hmo to maccabi\n"
+            "   How to detect correction: If user writes field name + value (e.g., \"tier silver\") or just value (\"silver\") → It's a correction!\n"
+            "   **Action**: Update the appropriate field, show updated summary, and go back to Step 1 (ask \"Is all the information correct?\" again)\n\n"
+            "c. **If user asks a question** (has question mark or question words like \"what\", \"why\", \"how\") → Refuse!\n"
+            "   \"I'm an information collection bot only and cannot answer questions right now. Please confirm the details or correct if there's an error.\"\n\n"
+            "**Remember**: Do NOT write 'COLLECTION_COMPLETE' if user corrected a field! Go back to Step 1 and ask for confirmation again.\n"
+        ),
+    },
+}
 
 
 def build_generation_prompt(
     user_data: UserData,
     validation_errors: Dict[str, str],
-    language: str = "he"
+    language: str = "he",
+    turn_kind: Optional[str] = None
 ) -> str:
     """
     Build the generation prompt for Step 2 (friendly response).
 
+    Delegates to an lru_cache'd helper keyed on the scalar field values
+    plus the (frozen) validation errors, mirroring build_collection_prompt.
+    Pure function (no I/O), safe to call inline from async handlers.
+
     Args:
         user_data: Current validated user data
         validation_errors: Dict of field_name -> error_message (can have multiple errors)
         language: Conversation language
+        turn_kind: Optional classify_confirmation_turn result; at the
+            confirmation stage "confirm"/"question" select a one-line
+            instruction instead of the full correction-detection rules.
+            "fused" selects the state-relative instructions used by the
+            single-call collection prompt
 
     Returns:
         System prompt for generation
     """
-    if language == "he":
-        prompt = """## תפקיד:
-אתה רובוט איסוף מידע. תפקידך: לאסוף 7 שדות בלבד.
+    return _build_generation_prompt_cached(
+        language,
+        *_GET_FIELDS(user_data),
+        user_data.get_missing_fields(),
+        tuple(sorted(validation_errors.items())),
+        turn_kind,
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _build_generation_prompt_cached(
+    language: str,
+    name: Optional[str],
+    id_: Optional[str],
+    gender: Optional[str],
+    age: Optional[int],
+    hmo: Optional[str],
+    hmo_card: Optional[str],
+    tier: Optional[str],
+    missing: Tuple[str, ...],
+    validation_errors: Tuple[Tuple[str, str], ...],
+    turn_kind: Optional[str] = None,
+) -> str:
+    """Assemble the generation prompt from hashable scalars (cache-friendly)."""
+    lang = "he" if language == "he" else "en"
+    strings = _GENERATION_STRINGS[lang]
+    parts = [_GENERATION_BASE[lang]]
+
+    # Show current data (age 0 is valid, hence the explicit None/"" check)
+    for label, value in zip(_FIELD_LABELS[lang], (name, id_, gender, age, hmo, hmo_card, tier)):
+        if value is not None and value != "":
+            parts.append(f"[COLLECTED] {label}: {value}\n")
+
+    # Show validation errors (can be multiple), then the matching
+    # instructions. The fused turn gets state-relative instructions: the
+    # prompt is built from the pre-extraction state, so naming a concrete
+    # missing field here would tell the model to re-ask the very field
+    # the current message answers.
+    if turn_kind == "fused":
+        parts.append(strings["fused_reply"])
+    elif validation_errors:
+        parts.append(strings["errors_header"])
+        for field, error in validation_errors:
+            parts.append(f"- {field}: {error}\n")
+        parts.append(strings["fix_errors"])
+    elif missing:
+        parts.append(strings["ask_missing"].format(missing[0]))
+    elif turn_kind == "confirm":
+        parts.append(strings["confirm_turn"])
+    elif turn_kind == "question":
+        parts.append(strings["question_turn"])
+    else:
+        parts.append(strings["confirmation"])
 
-## כללים קריטיים:
-1. **אכיפת שפה**: אם המשתמש כותב באנגלית, אמור: "נראה שאתה כותב באנגלית. אנא לחץ על 'Start Over' בסרגל הצד ובחר English."
+    return "".join(parts)
 
-2. **מה מותר ומה אסור**:
-   - **מותר**: ענה רק על שאלות הבהרה על השדה שאתה מבקש עכשיו (למשל: "מה זה tier?" כשאתה שואל על tier)
-   - **אסור**: שאלות כלליות, רפואיות לא קשורות, שיחת חולין, או שאלות על שדות אחרים
-   - **דחייה**: אם שאלה אסורה, אמור: "אני רובוט איסוף מידע בלבד. לא אוכל לענות כרגע. אוכל לעזור רק אחרי הרישום. בואו נמשיך - [שאל על השדה החסר]"
 
-3. **טיפול בתיקונים בשלב האישור**:
-   - אם המשתמש מתקן שדה → עדכן, הצג סיכום מעודכן, שאל אישור שוב
-   - אל תכתוב COLLECTION_COMPLETE עד אישור מפורש (כן/נכון/אישור)
+# Fused collection turn: one LLM call does extraction and the friendly
+# reply together, halving per-turn latency/cost on the happy path. The
+# handler falls back to the two-step pattern when the fused output can't
+# be parsed, and regenerates the reply if validation rejects a field.
+_FUSED_HEADER = (
+    "You will do two tasks in one turn. Respond with a single JSON object of the form\n"
+    '{"extracted": {...}, "reply": "..."} and nothing else.\n'
+    "\n"
+    '### Task 1 - "extracted"\n'
+)
 
-## המצב הנוכחי:
-"""
-        # Show current data
-        if user_data.name:
-            prompt += f"[COLLECTED] שם: {user_data.name}\n"
-        if user_data.id:
-            prompt += f"[COLLECTED] ת.ז: {user_data.id}\n"
-        if user_data.gender:
-            prompt += f"[COLLECTED] מין: {user_data.gender}\n"
-        if user_data.age is not None:
-            prompt += f"[COLLECTED] גיל: {user_data.age}\n"
-        if user_data.hmo:
-            prompt += f"[COLLECTED] קופת חולים: {user_data.hmo}\n"
-        if user_data.hmo_card:
-            prompt += f"[COLLECTED] כרטיס קופת חולים: {user_data.hmo_card}\n"
-        if user_data.tier:
-            prompt += f"[COLLECTED] מסלול: {user_data.tier}\n"
-
-        # Show validation errors (can be multiple)
-        if validation_errors:
-            prompt += "\n## שגיאות אימות:\n"
-            for field, error in validation_errors.items():
-                prompt += f"- {field}: {error}\n"
-
-        # Instructions
-        missing = user_data.get_missing_fields()
-        if validation_errors:
-            prompt += "\n**הוראות**: הסבר בעדינות את כל הבעיות ובקש את השדות שוב.\n"
-        elif missing:
-            prompt += f"\n**הוראות**: שאל על השדה החסר הבא: {missing[0]}\n"
-        else:
-            prompt += "\n**הוראות קריטיות - יש לבצע בדיוק לפי הסדר הזה**:\n\n"
-            prompt += "**שלב 1 - הצג את הסיכום המלא**:\n"
-            prompt += "הצג את כל 7 השדות (שם, ת.ז, מין, גיל, קופת חולים, כרטיס, מסלול) ושאל: \"האם כל הפרטים נכונים?\"\n\n"
-
-            prompt += "**שלב 2 - נתח את תשובת המשתמש בדיוק**:\n"
-            prompt += "א. **אם המשתמש אומר**: \"כן\", \"נכון\", \"אישור\", \"בסדר\", \"correct\", \"yes\" → כתוב בדיוק 'COLLECTION_COMPLETE' בתשובה\n\n"
-
-            prompt += "ב. **אם המשתמש כותב ערך של שדה** (ללא שאלה) → זהו תיקון!\n"
-            prompt += "   דוגמאות לתיקון:\n"
-            prompt += "   - \"מסלול כסף\" → עדכן tier ל-silver\n"
-            prompt += "   - \"מסלול ארד\" → עדכן tier ל-bronze\n"
-            prompt += "   - \"גילי 40\" → עדכן age ל-40\n"
-            prompt += "   - \"קוראים לי דוד\" → עדכן name ל-דוד\n"
-            prompt += "   - \"זכר\" → עדכן gender ל-male\n"
-            prompt += "   - \"מכבי\" → עדכן hmo ל-maccabi\n"
-            prompt += "   כיצד לזהות תיקון: אם המשתמש כותב רק שם שדה + ערך (למשל \"מסלול כסף\") או רק ערך (\"כסף\") → זהו תיקון!\n"
-            prompt += "   **פעולה**: עדכן את השדה המתאים, הצג סיכום מעודכן, וחזור לשלב 1 (שאל \"האם כל הפרטים נכונים?\" שוב)\n\n"
-
-            prompt += "ג. **אם המשתמש שואל שאלה** (יש סימן שאלה או מילת שאלה כמו \"מה\", \"למה\", \"איך\") → סרב!\n"
-            prompt += "   \"אני רובוט איסוף מידע בלבד ולא יכול לענות על שאלות ברגע זה. נא לאשר את הפרטים או לתקן אם יש טעות.\"\n\n"
-
-            prompt += "**זכור**: אל תכתוב 'COLLECTION_COMPLETE' אם המשתמש תיקן שדה! חזור לשלב 1 ושאל אישור שוב.\n"
+_FUSED_REPLY_HEADER = (
+    "\n"
+    '### Task 2 - "reply"\n'
+    "Write the assistant's next message following these instructions:\n"
+    "\n"
+)
 
-    else:
-        prompt = """## Role:
-You are an information collection bot. Your task: collect 7 fields only.
 
-## Critical Rules:
-1. **Language Enforcement**: If the user writes in Hebrew, say: "It looks like you're writing in Hebrew. Please click 'Start Over' in the sidebar and select עברית."
+def build_fused_collection_prompt(user_data: UserData, language: str = "he") -> str:
+    """
+    Build the single-call system prompt combining extraction and generation.
 
-2. **What You Can and Cannot Answer**:
-   - **CAN answer**: Only clarification questions about the current field you're asking for (e.g., "What is tier?" when you're asking for tier)
-   - **CANNOT answer**: General questions, unrelated medical questions, casual chat, or questions about other fields
-   - **Rejection**: If forbidden, say: "I'm an information collection bot only. I cannot answer right now. I can help only after registration. Let's continue - [ask for the missing field]"
+    Composes the (cached) generation prompt with the extraction spec under
+    a JSON envelope instruction; the model returns both the extracted
+    fields and the conversational reply in one completion. Because the
+    prompt carries the pre-extraction state, the reply half uses
+    state-relative instructions ("ask for the first field still missing
+    after applying what you extracted") rather than naming a concrete
+    missing field, which would be the field this very message answers.
 
-3. **Handling Corrections at Confirmation**:
-   - If user corrects a field → Update, show updated summary, ask for confirmation again
-   - Do NOT write COLLECTION_COMPLETE until explicit confirmation (yes/correct/confirm)
+    Args:
+        user_data: Current user data (pre-merge state for this turn)
+        language: Conversation language
 
-## Current Status:
-"""
-        # Show current data
-        if user_data.name:
-            prompt += f"[COLLECTED] Name: {user_data.name}\n"
-        if user_data.id:
-            prompt += f"[COLLECTED] ID: {user_data.id}\n"
-        if user_data.gender:
-            prompt += f"[COLLECTED] Gender: {user_data.gender}\n"
-        if user_data.age is not None:
-            prompt += f"[COLLECTED] Age: {user_data.age}\n"
-        if user_data.hmo:
-            prompt += f"[COLLECTED] HMO: {user_data.hmo}\n"
-        if user_data.hmo_card:
-            prompt += f"[COLLECTED] HMO card: {user_data.hmo_card}\n"
-        if user_data.tier:
-            prompt += f"[COLLECTED] Tier: {user_data.tier}\n"
-
-        # Show validation errors (can be multiple)
-        if validation_errors:
-            prompt += "\n## Validation Errors:\n"
-            for field, error in validation_errors.items():
-                prompt += f"- {field}: {error}\n"
-
-        # Instructions
-        missing = user_data.get_missing_fields()
-        if validation_errors:
-            prompt += "\n**Instructions**: Gently explain all issues and ask for the fields again.\n"
-        elif missing:
-            prompt += f"\n**Instructions**: Ask for the next missing field: {missing[0]}\n"
-        else:
-            prompt += "\n**Critical Instructions - Follow This Exact Order**:\n\n"
-            prompt += "**Step 1 - Show Complete Summary**:\n"
-            prompt += "Display all 7 fields (name, ID, gender, age, HMO, card, tier) and ask: \"Is all the information correct?\"\n\n"
-
-            prompt += "**Step 2 - Analyze User Response Precisely**:\n"
-            prompt += "a. **If user says**: \"yes\", \"correct\", \"confirm\", \"ok\" → Write exactly 'COLLECTION_COMPLETE' in response\n\n"
-
-            prompt += "b. **If user writes a field value** (without a question) → This is a correction!\n"
-            prompt += "   Examples of corrections:\n"
-            prompt += "   - \"tier silver\" → update tier to silver\n"
-            prompt += "   - \"tier bronze\" → update tier to bronze\n"
-            prompt += "   - \"age 40\" → update age to 40\n"
-            prompt += "   - \"my name is David\" → update name to David\n"
-            prompt += "   - \"male\" → update gender to male\n"
-            prompt += "   - \"maccabi\" → update hmo to maccabi\n"
-            prompt += "   How to detect correction: If user writes field name + value (e.g., \"tier silver\") or just value (\"silver\") → It's a correction!\n"
-            prompt += "   **Action**: Update the appropriate field, show updated summary, and go back to Step 1 (ask \"Is all the information correct?\" again)\n\n"
-
-            prompt += "c. **If user asks a question** (has question mark or question words like \"what\", \"why\", \"how\") → Refuse!\n"
-            prompt += "   \"I'm an information collection bot only and cannot answer questions right now. Please confirm the details or correct if there's an error.\"\n\n"
-
-            prompt += "**Remember**: Do NOT write 'COLLECTION_COMPLETE' if user corrected a field! Go back to Step 1 and ask for confirmation again.\n"
-
-    return prompt
+    Returns:
+        System prompt for the fused collection call
+    """
+    return "".join((
+        _FUSED_HEADER,
+        EXTRACTION_PROMPT,
+        _FUSED_REPLY_HEADER,
+        build_generation_prompt(user_data, {}, language, turn_kind="fused"),
+    ))
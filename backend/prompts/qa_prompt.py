@@ -5,59 +5,61 @@ Uses retrieved knowledge base chunks to provide accurate answers
 specific to the user's HMO and insurance tier.
 """
 
-from typing import Dict, List, Any
-import sys
+import functools
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
+from types import MappingProxyType
 
-# Add parent directory to path so we can import from root backend folder
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Flat import: the backend root is on sys.path both in the container
+# (modules run from /app) and when launching uvicorn from backend/, so no
+# sys.path mutation is needed here.
 from models import UserData
 
 
-# Query planning prompt for Agentic RAG
-QUERY_PLANNING_PROMPT = """Analyze the user's question and determine the optimal database query filters.
+# Display-name maps built once at import instead of per call; the proxy
+# wrapper guards against accidental mutation (same pattern as the
+# normalization maps in models.py).
+_HMO_DISPLAY_HE = MappingProxyType({
+    "maccabi": "מכבי",
+    "meuhedet": "מאוחדת",
+    "clalit": "כללית",
+})
 
-Available chunk types:
-- "benefit": Specific service benefits (discounts, coverage limits)
-- "contact": Contact information (phone numbers, websites)
-- "context": General background information
+_TIER_DISPLAY_HE = MappingProxyType({
+    "gold": "זהב",
+    "silver": "כסף",
+    "bronze": "ארד",
+})
 
-Available categories:
-- "dental", "optometry", "alternative", "communication", "pregnancy", "workshops"
+# Retrieval metadata can also carry "all" (tier-/HMO-agnostic chunks);
+# translate it so the LLM doesn't see a bare English token.
+_HMO_DISPLAY_HE_ALL = MappingProxyType({**_HMO_DISPLAY_HE, "all": "כל הקופות"})
+_TIER_DISPLAY_HE_ALL = MappingProxyType({**_TIER_DISPLAY_HE, "all": "כל המסלולים"})
 
-Output ONLY valid JSON with these fields:
-{
-  "chunk_type": "benefit" | "contact" | "context" | null,
-  "category": "dental" | "optometry" | "alternative" | "communication" | "pregnancy" | "workshops" | null,
-  "ignore_tier": true | false,
-  "needs_comparison": true | false
-}
 
-Rules:
-- Set "chunk_type": "contact" if user asks about phone numbers, calling, contacting, reaching out
-- Set "ignore_tier": true for contact queries (contact info is tier-agnostic)
-- Set "needs_comparison": true if comparing tiers (gold vs silver) or HMOs
-- Set category if question is about a specific service type
-- Set null for fields that shouldn't be filtered
+# The multi-kilobyte prompt bodies live as plain-text resources next to
+# this module (same layout as collection_prompt); keeping them out of the
+# source shrinks the .pyc and speeds up import. The cached loader reads
+# each file once per process.
+_RESOURCES = Path(__file__).parent / "resources"
 
-Examples:
 
-User: "What's Maccabi's phone number?"
-Output: {"chunk_type": "contact", "category": null, "ignore_tier": true, "needs_comparison": false}
+@functools.cache
+def _load_resource(name: str) -> str:
+    """Read a prompt resource file once; cached for the process lifetime."""
+    return (_RESOURCES / name).read_text(encoding="utf-8")
 
-User: "How can I contact the dental department?"
-Output: {"chunk_type": "contact", "category": "dental", "ignore_tier": true, "needs_comparison": false}
 
-User: "How much is acupuncture?"
-Output: {"chunk_type": "benefit", "category": "alternative", "ignore_tier": false, "needs_comparison": false}
+# Query planning prompt for Agentic RAG
+QUERY_PLANNING_PROMPT = _load_resource("query_planning.txt")
 
-User: "What's the difference between gold and silver for dental?"
-Output: {"chunk_type": "benefit", "category": "dental", "ignore_tier": true, "needs_comparison": true}
 
-User: "Tell me about alternative medicine"
-Output: {"chunk_type": "context", "category": "alternative", "ignore_tier": true, "needs_comparison": false}
+# Static QA prompt bodies, loaded once at import. Only the profile and
+# retrieved-context slots vary per call, so the hot path does a single
+# C-level format_map pass instead of re-assembling a ~2KB f-string.
+_QA_TEMPLATE_HE = _load_resource("qa_template_he.txt")
 
-Output ONLY the JSON object, no explanation."""
+_QA_TEMPLATE_EN = _load_resource("qa_template_en.txt")
 
 
 def build_qa_prompt(
@@ -76,80 +78,99 @@ def build_qa_prompt(
     Returns:
         System prompt for Q&A
     """
-    # Map internal values to Hebrew display names
-    hmo_display = {
-        "maccabi": "מכבי",
-        "meuhedet": "מאוחדת",
-        "clalit": "כללית"
-    }
-
-    tier_display = {
-        "gold": "זהב",
-        "silver": "כסף",
-        "bronze": "ארד"
-    }
+    return _build_qa_prompt_cached(user_data.as_tuple(), retrieved_context, language)
 
-    if language == "he":
-        prompt = f"""אתה עוזר מומחה לשירותי בריאות שעונה על שאלות על בסיס בסיס הידע שסופק.
-
-## פרופיל המשתמש:
-- שם: {user_data.name}
-- גיל: {user_data.age}
-- מין: {user_data.gender}
-- קופת חולים: {hmo_display.get(user_data.hmo, user_data.hmo)}
-- מסלול ביטוח: {tier_display.get(user_data.tier, user_data.tier)}
-
-## כללי התנהגות:
-1. **ענה רק על בסיס המידע שסופק למטה** - אל תמציא מידע או תשתמש בידע כללי
-2. **התמקד במסלול של המשתמש** - המשתמש במסלול {tier_display.get(user_data.tier, user_data.tier)} של {hmo_display.get(user_data.hmo, user_data.hmo)}
-3. **צטט מספרים מדויקים** - אחוזי הנחה, מחירים, מגבלות - הכל חייב להיות מדויק
-4. **אם אין מידע** - אמור בבירור "אין לי מידע על כך" במקום לנחש
-5. **השווה בין מסלולים** - אם המשתמש שואל, הראה הבדלים בין זהב/כסף/ארד
-6. **השווה בין קופות** - אם המשתמש שואל, הראה הבדלים בין מכבי/מאוחדת/כללית
-
-## בסיס הידע (מידע רלוונטי שנמשך):
-{retrieved_context}
-
-## הוראות תשובה:
-- היה ברור וקצר
-- התחל עם המידע הרלוונטי ביותר למסלול של המשתמש
-- אם יש מספרים (אחוזים, מחירים), ציין אותם במדויק
-- אם המשתמש שואל "כמה עולה X?" - תן תשובה ספציפית למסלול שלו
-- אם המשתמש שואל "מה ההבדל בין X ל-Y?" - השווה באופן ישיר
-
-זכור: אתה משרת משתמש ב**{hmo_display.get(user_data.hmo, user_data.hmo)} {tier_display.get(user_data.tier, user_data.tier)}** - זה המידע החשוב ביותר עבורו!"""
 
+@functools.lru_cache(maxsize=256)
+def _build_qa_prompt_cached(
+    user_tuple: Tuple[Optional[str], Optional[str], Optional[str], Optional[int],
+                      Optional[str], Optional[str], Optional[str]],
+    retrieved_context: str,
+    language: str,
+) -> str:
+    """
+    Cached QA prompt assembly keyed on the user snapshot plus the
+    retrieved-context string. Repeat questions over the same profile and
+    chunks (common in a session) skip the interpolation entirely.
+    """
+    name, _, gender, age, hmo, _, tier = user_tuple
+
+    if language == "he":
+        template = _QA_TEMPLATE_HE
+        hmo_text = _HMO_DISPLAY_HE.get(hmo, hmo)
+        tier_text = _TIER_DISPLAY_HE.get(tier, tier)
     else:  # English
-        prompt = f"""You are a medical services expert assistant that answers questions based on the provided knowledge base.
+        template = _QA_TEMPLATE_EN
+        hmo_text = hmo.title()
+        tier_text = tier.title()
+
+    return template.format_map({
+        "name": name,
+        "age": age,
+        "gender": gender,
+        "hmo_display": hmo_text,
+        "tier_display": tier_text,
+        "retrieved_context": retrieved_context,
+    })
+
+
+# Per-chunk-type formatters for format_retrieved_chunks, dispatched by one
+# dict lookup instead of an if/elif ladder per chunk (same pattern as the
+# field-validator table in models.py).
+
+def _hmo_en(hmo: str) -> str:
+    return "All HMOs" if hmo == "all" else hmo.title()
+
 
-## User Profile:
-- Name: {user_data.name}
-- Age: {user_data.age}
-- Gender: {user_data.gender}
-- HMO: {user_data.hmo.title()}
-- Insurance Tier: {user_data.tier.title()}
+def _tier_en(tier: str) -> str:
+    return "All Tiers" if tier == "all" else tier.title()
 
-## Behavior Rules:
-1. **Answer only based on the information provided below** - don't invent information or use general knowledge
-2. **Focus on the user's tier** - The user has {user_data.tier.title()} tier with {user_data.hmo.title()}
-3. **Quote exact numbers** - discounts, prices, limits - everything must be accurate
-4. **If there's no information** - clearly say "I don't have information about that" instead of guessing
-5. **Compare between tiers** - if the user asks, show differences between Gold/Silver/Bronze
-6. **Compare between HMOs** - if the user asks, show differences between Maccabi/Meuhedet/Clalit
 
-## Knowledge Base (retrieved relevant information):
-{retrieved_context}
+def _fmt_context_he(doc, m):
+    return f"[הקשר כללי - {m.get('category', 'unknown')}]\n{doc}\n"
 
-## Response Instructions:
-- Be clear and concise
-- Start with the most relevant information for the user's tier
-- If there are numbers (percentages, prices), state them exactly
-- If the user asks "How much does X cost?" - give a specific answer for their tier
-- If the user asks "What's the difference between X and Y?" - compare directly
 
-Remember: You're serving a user with **{user_data.hmo.title()} {user_data.tier.title()}** - this is the most important information for them!"""
+def _fmt_benefit_he(doc, m):
+    hmo = m.get("hmo", "unknown")
+    tier = m.get("tier", "unknown")
+    return (
+        f"[שירות: {m.get('service', 'unknown')} | "
+        f"קופה: {_HMO_DISPLAY_HE_ALL.get(hmo, hmo)} | "
+        f"מסלול: {_TIER_DISPLAY_HE_ALL.get(tier, tier)}]\n{doc}\n"
+    )
 
-    return prompt
+
+def _fmt_contact_he(doc, m):
+    hmo = m.get("hmo", "unknown")
+    return f"[פרטי התקשרות - {m.get('category', 'unknown')} | {_HMO_DISPLAY_HE_ALL.get(hmo, hmo)}]\n{doc}\n"
+
+
+def _fmt_default_he(doc, m):
+    return f"[מידע]\n{doc}\n"
+
+
+def _fmt_context_en(doc, m):
+    return f"[General Context - {m.get('category', 'unknown')}]\n{doc}\n"
+
+
+def _fmt_benefit_en(doc, m):
+    return (
+        f"[Service: {m.get('service', 'unknown')} | "
+        f"HMO: {_hmo_en(m.get('hmo', 'unknown'))} | "
+        f"Tier: {_tier_en(m.get('tier', 'unknown'))}]\n{doc}\n"
+    )
+
+
+def _fmt_contact_en(doc, m):
+    return f"[Contact Info - {m.get('category', 'unknown')} | {_hmo_en(m.get('hmo', 'unknown'))}]\n{doc}\n"
+
+
+def _fmt_default_en(doc, m):
+    return f"[Information]\n{doc}\n"
+
+
+_FMT_HE = {"context": _fmt_context_he, "benefit": _fmt_benefit_he, "contact": _fmt_contact_he}
+_FMT_EN = {"context": _fmt_context_en, "benefit": _fmt_benefit_en, "contact": _fmt_contact_en}
 
 
 def format_retrieved_chunks(chunks_dict: Dict[str, Any], language: str = "he") -> str:
@@ -172,59 +193,13 @@ def format_retrieved_chunks(chunks_dict: Dict[str, Any], language: str = "he") -
     documents = chunks_dict["documents"]
     metadatas = chunks_dict["metadatas"]
 
-    context_parts = []
-
-    # Display name mappings
-    hmo_display_he = {
-        "maccabi": "מכבי",
-        "meuhedet": "מאוחדת",
-        "clalit": "כללית",
-        "all": "כל הקופות"  # Translate "all" to avoid confusion
-    }
-
-    tier_display_he = {
-        "gold": "זהב",
-        "silver": "כסף",
-        "bronze": "ארד",
-        "all": "כל המסלולים"  # Translate "all" to avoid confusion
-    }
-
-    for i, (doc, metadata) in enumerate(zip(documents, metadatas), 1):
-        chunk_type = metadata.get("type", "unknown")
-        category = metadata.get("category", "unknown")
-        hmo = metadata.get("hmo", "unknown")
-        tier = metadata.get("tier", "unknown")
+    # One table lookup per chunk instead of the per-language elif ladder
+    fmt_table = _FMT_HE if language == "he" else _FMT_EN
+    default = _fmt_default_he if language == "he" else _fmt_default_en
 
-        if language == "he":
-            # Format based on chunk type
-            if chunk_type == "context":
-                context_parts.append(f"[הקשר כללי - {category}]\n{doc}\n")
-            elif chunk_type == "benefit":
-                service = metadata.get("service", "unknown")
-                hmo_text = hmo_display_he.get(hmo, hmo)
-                tier_text = tier_display_he.get(tier, tier)
-                context_parts.append(
-                    f"[שירות: {service} | קופה: {hmo_text} | מסלול: {tier_text}]\n{doc}\n"
-                )
-            elif chunk_type == "contact":
-                hmo_text = hmo_display_he.get(hmo, hmo)
-                context_parts.append(f"[פרטי התקשרות - {category} | {hmo_text}]\n{doc}\n")
-            else:
-                context_parts.append(f"[מידע]\n{doc}\n")
-        else:  # English
-            if chunk_type == "context":
-                context_parts.append(f"[General Context - {category}]\n{doc}\n")
-            elif chunk_type == "benefit":
-                service = metadata.get("service", "unknown")
-                hmo_text = "All HMOs" if hmo == "all" else hmo.title()
-                tier_text = "All Tiers" if tier == "all" else tier.title()
-                context_parts.append(
-                    f"[Service: {service} | HMO: {hmo_text} | Tier: {tier_text}]\n{doc}\n"
-                )
-            elif chunk_type == "contact":
-                hmo_text = "All HMOs" if hmo == "all" else hmo.title()
-                context_parts.append(f"[Contact Info - {category} | {hmo_text}]\n{doc}\n")
-            else:
-                context_parts.append(f"[Information]\n{doc}\n")
+    context_parts = [
+        fmt_table.get(metadata.get("type"), default)(doc, metadata)
+        for doc, metadata in zip(documents, metadatas)
+    ]
 
     return "\n---\n".join(context_parts)
@@ -5,19 +5,24 @@ Step 1: Extract structured data (JSON) from user message
 Step 2: Generate friendly response based on validated data
 """
 
-import sys
-from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
 import logging
-import json
 
-# Add parent directory to path for local development
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+import orjson
+
 from models import ChatRequest, ChatResponse, Message, UserData
 from services.openai_client import get_openai_client
 from prompts.collection_prompt import (
     EXTRACTION_PROMPT,
-    build_generation_prompt
+    EXTRACTION_SCHEMA,
+    FUSED_COLLECTION_SCHEMA,
+    LANGUAGE_REDIRECTS,
+    build_fused_collection_prompt,
+    build_generation_prompt,
+    classify_confirmation_turn,
+    detect_script,
+    fast_extract,
+    is_extraction_noop
 )
 
 # Setup logging
@@ -40,42 +45,41 @@ async def extract_user_data(
     Returns:
         Dictionary with extracted fields (normalized by LLM)
     """
-    # Build messages with last 2-3 turns for context
+    # Single-expression build: system prompt, the last 2-3 turns for
+    # context (helps with "30" → age mapping; the negative slice is
+    # bounded), then the current message
     messages = [
-        {"role": "system", "content": EXTRACTION_PROMPT}
+        {"role": "system", "content": EXTRACTION_PROMPT},
+        *({"role": m.role, "content": m.content} for m in conversation_history[-4:]),
+        {"role": "user", "content": user_message},
     ]
 
-    # Add last 2-3 turns for context (helps with "30" → age mapping)
-    recent_history = conversation_history[-4:] if len(conversation_history) > 4 else conversation_history
-    for msg in recent_history:
-        messages.append({
-            "role": msg.role,
-            "content": msg.content
-        })
-
-    # Add current message
-    messages.append({
-        "role": "user",
-        "content": user_message
-    })
-
     try:
-        # Call LLM for extraction (low temperature for consistency)
+        # Call LLM for extraction (low temperature for consistency);
+        # the schema constrains decoding to the exact 7-field JSON shape
         response = await openai_client.chat(
             messages=messages,
             temperature=0.1,
-            max_tokens=200
+            max_tokens=200,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "user_extract",
+                    "schema": EXTRACTION_SCHEMA,
+                    "strict": True
+                }
+            }
         )
 
         json_str = response["content"].strip()
 
-        # Parse JSON
-        extracted_data = json.loads(json_str)
+        # Parse JSON (orjson: same parse the response path already uses)
+        extracted_data = orjson.loads(json_str)
 
         logger.debug(f"Extracted data: {extracted_data}")
         return extracted_data
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.warning(f"Failed to parse extraction JSON: {e}. Response: {json_str}")
         return {}
     except Exception as e:
@@ -83,6 +87,60 @@ async def extract_user_data(
         return {}
 
 
+async def extract_and_respond(
+    request: ChatRequest,
+    openai_client
+) -> Optional[Tuple[Dict[str, Any], str, int]]:
+    """
+    Fused collection turn: extraction + friendly reply in one LLM call.
+
+    Halves per-turn latency and tokens versus the two-step pattern on the
+    happy path. Returns None when the model's output doesn't match the
+    expected envelope, in which case the caller falls back to two-step.
+
+    Args:
+        request: Chat request with current message, user_data, and history
+        openai_client: Azure OpenAI client
+
+    Returns:
+        Tuple of (extracted_data, reply, tokens_used), or None on failure
+    """
+    messages = [
+        {"role": "system", "content": build_fused_collection_prompt(request.user_data, request.language)},
+        *({"role": m.role, "content": m.content} for m in request.conversation_history),
+        {"role": "user", "content": request.message},
+    ]
+
+    try:
+        # The strict schema constrains decoding to the exact envelope, with
+        # the extraction member typed the same way the two-step path is
+        response = await openai_client.chat(
+            messages=messages,
+            temperature=0.3,
+            max_tokens=600,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "collection_turn",
+                    "schema": FUSED_COLLECTION_SCHEMA,
+                    "strict": True
+                }
+            }
+        )
+        payload = orjson.loads(response["content"])
+    except Exception as e:
+        logger.warning(f"Fused collection call failed, falling back to two-step: {e}")
+        return None
+
+    extracted = payload.get("extracted")
+    reply = payload.get("reply")
+    if not isinstance(extracted, dict) or not isinstance(reply, str) or not reply:
+        logger.warning("Fused collection output missing extracted/reply - falling back to two-step")
+        return None
+
+    return extracted, reply, response["tokens_used"]
+
+
 def validate_and_merge(
     current_user_data: UserData,
     extracted_data: Dict[str, Any]
@@ -97,19 +155,13 @@ def validate_and_merge(
     Returns:
         Tuple of (updated_user_data, validation_errors)
     """
-    # Create a dict from current data
-    updated_data = current_user_data.model_dump()
-
-    # Merge extracted data (only non-null values)
-    for field, value in extracted_data.items():
-        if value is not None:
-            updated_data[field] = value
-
-    # Create new UserData instance (Pydantic will normalize)
+    # Copy-with-update touches only the changed fields; merged_with applies
+    # the same normalization the field validators would, without re-running
+    # validator dispatch over every unchanged field
     try:
-        merged_user_data = UserData(**updated_data)
+        merged_user_data = current_user_data.merged_with(extracted_data)
     except Exception as e:
-        logger.error(f"Failed to create UserData: {e}")
+        logger.error(f"Failed to merge UserData: {e}")
         # Return current data unchanged if merge fails
         return current_user_data, {"general": "Failed to process data"}
 
@@ -126,12 +178,11 @@ def validate_and_merge(
 
     # If there are validation errors, don't update those fields
     if validation_errors:
-        # Revert invalid fields to previous values
-        final_data = merged_user_data.model_dump()
-        for field in validation_errors.keys():
-            final_data[field] = getattr(current_user_data, field)
-
-        final_user_data = UserData(**final_data)
+        # Revert invalid fields to their previous (already-normalized) values
+        final_user_data = merged_user_data.merged_with(
+            {field: getattr(current_user_data, field) for field in validation_errors},
+            keep_none=True
+        )
         return final_user_data, validation_errors
 
     return merged_user_data, {}
@@ -159,27 +210,22 @@ async def generate_friendly_response(
     Returns:
         Tuple of (friendly_response, tokens_used)
     """
+    # At the confirmation stage classify the turn in Python so the prompt
+    # carries a one-line instruction instead of the correction-rules block
+    turn_kind = None
+    if not validation_errors and not user_data.get_missing_fields():
+        turn_kind = classify_confirmation_turn(user_message, language)
+
     # Build generation prompt with validated state
-    system_prompt = build_generation_prompt(user_data, validation_errors, language)
+    system_prompt = build_generation_prompt(user_data, validation_errors, language, turn_kind)
 
-    # Build messages
+    # Build messages in one expression
     messages = [
-        {"role": "system", "content": system_prompt}
+        {"role": "system", "content": system_prompt},
+        *({"role": m.role, "content": m.content} for m in conversation_history),
+        {"role": "user", "content": user_message},
     ]
 
-    # Add conversation history
-    for msg in conversation_history:
-        messages.append({
-            "role": msg.role,
-            "content": msg.content
-        })
-
-    # Add current message
-    messages.append({
-        "role": "user",
-        "content": user_message
-    })
-
     # Call LLM for generation
     response = await openai_client.chat(
         messages=messages,
@@ -240,16 +286,56 @@ Let's get started - what is your full name?"""
                 }
             )
 
+        # Language enforcement in Python: a wrong-script message gets the
+        # canned redirect without spending an LLM turn on classification
+        script = detect_script(request.message)
+        if script != "mixed" and script != request.language:
+            logger.info("Wrong-script message (%s while language=%s) - redirecting", script, request.language)
+            return ChatResponse(
+                response=LANGUAGE_REDIRECTS[request.language],
+                phase="collection",
+                user_data=request.user_data,
+                missing_fields=request.user_data.get_missing_fields(),
+                sources=[],
+                metadata={
+                    "tokens_used": 0,
+                    "language_redirect": True
+                }
+            )
+
         # Get OpenAI client
         openai_client = get_openai_client()
 
-        # STEP 1: Extract structured data from user message
-        logger.info("Collection Step 1: Extracting data...")
-        extracted_data = await extract_user_data(
-            request.message,
-            request.conversation_history,
-            openai_client
-        )
+        # STEP 1: Extract structured data from user message.
+        # Try the regex fast path first: when the user directly answers the
+        # field we just asked for, this skips the extraction LLM round-trip.
+        missing_before = request.user_data.get_missing_fields()
+        asked_field = missing_before[0] if missing_before else None
+
+        fused_reply = None
+        fused_tokens = 0
+
+        extracted_data = fast_extract(request.message, asked_field)
+        if extracted_data:
+            logger.info("Collection Step 1: fast-path extraction hit (%s)", asked_field)
+        elif is_extraction_noop(request.message, request.language):
+            # A bare "yes"/"כן" (the typical confirmation turn) carries no
+            # new fields - skip extraction and go straight to generation,
+            # which classifies the turn and handles COLLECTION_COMPLETE
+            logger.info("Collection Step 1: pure confirmation - skipping extraction")
+        else:
+            # Fused path: extraction + reply in a single LLM call
+            fused = await extract_and_respond(request, openai_client)
+            if fused is not None:
+                extracted_data, fused_reply, fused_tokens = fused
+                logger.info("Collection: fused extraction+generation call succeeded")
+            else:
+                logger.info("Collection Step 1: Extracting data...")
+                extracted_data = await extract_user_data(
+                    request.message,
+                    request.conversation_history,
+                    openai_client
+                )
 
         # Validate and merge with current data
         logger.info("Collection Step 1: Validating and merging...")
@@ -258,16 +344,21 @@ Let's get started - what is your full name?"""
             extracted_data
         )
 
-        # STEP 2: Generate friendly response
-        logger.info("Collection Step 2: Generating response...")
-        friendly_response, tokens_used = await generate_friendly_response(
-            updated_user_data,
-            validation_errors,
-            request.conversation_history,
-            request.message,
-            request.language,
-            openai_client
-        )
+        # STEP 2: Friendly response. The fused reply was generated before
+        # Python-side validation, so it is only usable when validation
+        # passed; otherwise regenerate with the error context.
+        if fused_reply is not None and not validation_errors:
+            friendly_response, tokens_used = fused_reply, fused_tokens
+        else:
+            logger.info("Collection Step 2: Generating response...")
+            friendly_response, tokens_used = await generate_friendly_response(
+                updated_user_data,
+                validation_errors,
+                request.conversation_history,
+                request.message,
+                request.language,
+                openai_client
+            )
 
         # Check if collection is complete
         is_complete = "COLLECTION_COMPLETE" in friendly_response
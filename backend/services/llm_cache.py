@@ -0,0 +1,130 @@
+"""
+In-process caches for LLM round-trips on the Q&A path.
+
+Two tiers:
+1. Exact: query plans are a deterministic function of the user message at
+   temperature 0.1, so an LRU keyed on the message text skips the planning
+   call on repeats.
+2. Semantic: FAQ-style questions repeat with slight rephrasing; answers are
+   cached against their question embedding and served when a new question's
+   cosine similarity clears a high threshold. Keys include the user's HMO,
+   tier, and language so personalization is never crossed.
+
+High-temperature collection replies are intentionally not cached.
+"""
+
+import functools
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Exact-match LRU for query plans
+_PLAN_CACHE_MAX = 2048
+_plan_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def get_cached_plan(message: str) -> Optional[Dict[str, Any]]:
+    """Return the cached query plan for an identical message, if any.
+
+    Callers must treat the returned dict as read-only.
+    """
+    plan = _plan_cache.get(message)
+    if plan is not None:
+        _plan_cache.move_to_end(message)
+    return plan
+
+
+def store_plan(message: str, plan: Dict[str, Any]) -> None:
+    """Cache a successfully parsed query plan, evicting the oldest entry."""
+    _plan_cache[message] = plan
+    _plan_cache.move_to_end(message)
+    if len(_plan_cache) > _PLAN_CACHE_MAX:
+        _plan_cache.popitem(last=False)
+
+
+class SemanticAnswerCache:
+    """
+    Embedding-similarity cache for generated QA answers.
+
+    Stores L2-normalized question embeddings in one (N, dim) matrix so a
+    lookup is a single matrix-vector product; entries are gated on the
+    (hmo, tier, language) key and evicted FIFO past max_entries.
+    """
+
+    def __init__(self, threshold: float = 0.97, max_entries: int = 512):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._keys: List[Tuple[Optional[str], Optional[str], str]] = []
+        self._matrix: Optional[np.ndarray] = None  # (N, dim), rows normalized
+        self._payloads: List[Tuple[str, list]] = []  # (answer, sources)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def get(
+        self,
+        embedding,
+        hmo: Optional[str],
+        tier: Optional[str],
+        language: str,
+    ) -> Optional[Tuple[str, list]]:
+        """Return (answer, sources) for a sufficiently similar cached question."""
+        if self._matrix is None:
+            self.misses += 1
+            return None
+
+        key = (hmo, tier, language)
+        sims = self._matrix @ self._normalize(embedding)
+
+        best_i = -1
+        best = self.threshold
+        for i, entry_key in enumerate(self._keys):
+            if entry_key == key and sims[i] >= best:
+                best = sims[i]
+                best_i = i
+
+        if best_i < 0:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info("Semantic answer cache hit (similarity=%.3f)", float(best))
+        return self._payloads[best_i]
+
+    def put(
+        self,
+        embedding,
+        hmo: Optional[str],
+        tier: Optional[str],
+        language: str,
+        answer: str,
+        sources: list,
+    ) -> None:
+        """Store a generated answer under its question embedding."""
+        vec = self._normalize(embedding).reshape(1, -1)
+        if self._matrix is None:
+            self._matrix = vec
+        else:
+            self._matrix = np.vstack((self._matrix, vec))
+        self._keys.append((hmo, tier, language))
+        self._payloads.append((answer, sources))
+
+        if len(self._keys) > self.max_entries:
+            self._matrix = self._matrix[1:]
+            del self._keys[0]
+            del self._payloads[0]
+
+
+@functools.cache
+def get_answer_cache() -> SemanticAnswerCache:
+    """Singleton semantic answer cache for the QA handler."""
+    return SemanticAnswerCache()
@@ -5,26 +5,67 @@ Provides embedding (ADA-002) and chat completion (GPT-4o) functionality
 with automatic retry on rate limit errors.
 """
 
-import sys
-from pathlib import Path
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+from typing import List, Dict, Any, Optional
 import logging
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-    before_sleep_log
-)
+
+import httpx
 from openai import AsyncAzureOpenAI, RateLimitError, APIError
 
-# Add parent directory to path for local development
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+# HTTP/2 multiplexing needs the optional h2 package; fall back to HTTP/1.1
+# (still connection-pooled) when it isn't installed
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
 from config import get_settings
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Stable user id sent with chat completions so the provider's automatic
+# prompt-prefix cache routes requests with identical prefixes to the same
+# cache shard instead of spreading them across shards
+_PROMPT_CACHE_USER = "medical-chatbot-backend"
+
+# Retry policy for transient Azure errors (rate limits, API errors)
+_MAX_ATTEMPTS = 3
+
+
+async def _with_retry(coro_factory):
+    """
+    Await coro_factory() with exponential backoff on transient errors.
+
+    A tight inline loop instead of a tenacity decorator: the happy path
+    (no retry, the overwhelmingly common case) pays no call-state
+    construction or predicate dispatch per invocation.
+
+    Args:
+        coro_factory: Zero-arg callable returning a fresh coroutine
+            (a coroutine object can only be awaited once)
+
+    Returns:
+        The result of the awaited coroutine
+
+    Raises:
+        RateLimitError / APIError: After the final attempt fails
+    """
+    for attempt in range(_MAX_ATTEMPTS):
+        try:
+            return await coro_factory()
+        except (RateLimitError, APIError) as e:
+            if attempt == _MAX_ATTEMPTS - 1:
+                raise
+            delay = min(10.0, 2.0 * (2 ** attempt))
+            logger.warning(
+                "%s on attempt %d/%d, retrying in %.0fs: %s",
+                type(e).__name__, attempt + 1, _MAX_ATTEMPTS, delay, e
+            )
+            await asyncio.sleep(delay)
+
 
 class AzureOpenAIClient:
     """
@@ -40,24 +81,42 @@ class AzureOpenAIClient:
         """Initialize async Azure OpenAI client with credentials from settings."""
         self.settings = get_settings()
 
+        # Explicit shared transport: concurrent embed/chat calls (the
+        # gather'd plan+embed and Step1+Step2 paths) multiplex over one
+        # pooled TCP+TLS connection instead of each opening its own,
+        # cutting handshake cost and head-of-line blocking
+        self._http = httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+
         self.client = AsyncAzureOpenAI(
             api_key=self.settings.AZURE_OPENAI_KEY,
             api_version=self.settings.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=self.settings.AZURE_OPENAI_ENDPOINT
+            azure_endpoint=self.settings.AZURE_OPENAI_ENDPOINT,
+            http_client=self._http
         )
 
-        logger.info("Async Azure OpenAI client initialized")
+        # In-flight embedding requests keyed by text digest: concurrent
+        # callers embedding the same text share one HTTP round-trip
+        self._inflight_embeds: Dict[bytes, asyncio.Future] = {}
+
+        logger.info(
+            "Async Azure OpenAI client initialized (http2=%s)", _HTTP2_AVAILABLE
+        )
+
+    async def aclose(self):
+        """Close the shared HTTP connection pool (called at shutdown)."""
+        await self._http.aclose()
 
-    @retry(
-        retry=retry_if_exception_type((RateLimitError, APIError)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        before_sleep=before_sleep_log(logger, logging.WARNING)
-    )
     async def embed(self, text: str) -> List[float]:
         """
         Embed text using Azure OpenAI ADA-002.
 
+        Concurrent identical texts (several users asking the same question
+        at once) are coalesced onto a single in-flight API request.
+
         Args:
             text: Text to embed
 
@@ -68,11 +127,32 @@ class AzureOpenAIClient:
             RateLimitError: If rate limit exceeded after retries
             APIError: If API error occurs after retries
         """
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        pending = self._inflight_embeds.get(key)
+        if pending is not None:
+            logger.debug("Coalescing duplicate in-flight embedding request")
+            return await pending
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight_embeds[key] = future
+        try:
+            embedding = await self._embed_uncoalesced(text)
+            future.set_result(embedding)
+            return embedding
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when no duplicate awaited it
+            raise
+        finally:
+            del self._inflight_embeds[key]
+
+    async def _embed_uncoalesced(self, text: str) -> List[float]:
+        """Issue the actual embedding API call (see embed for coalescing)."""
         try:
-            response = await self.client.embeddings.create(
+            response = await _with_retry(lambda: self.client.embeddings.create(
                 input=text,
                 model="text-embedding-ada-002"
-            )
+            ))
 
             embedding = response.data[0].embedding
             logger.debug(f"Successfully embedded text (length: {len(text)} chars)")
@@ -89,17 +169,12 @@ class AzureOpenAIClient:
             logger.error(f"Unexpected error during embedding: {e}")
             raise
 
-    @retry(
-        retry=retry_if_exception_type((RateLimitError, APIError)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        before_sleep=before_sleep_log(logger, logging.WARNING)
-    )
     async def chat(
         self,
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
-        max_tokens: int = 1000
+        max_tokens: int = 1000,
+        response_format: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Generate chat completion using Azure OpenAI GPT-4o.
@@ -108,6 +183,9 @@ class AzureOpenAIClient:
             messages: List of message dicts with 'role' and 'content' keys
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens in response
+            response_format: Optional structured-output spec, e.g.
+                {"type": "json_object"} or a {"type": "json_schema", ...}
+                dict for schema-constrained decoding
 
         Returns:
             Dictionary with:
@@ -120,12 +198,18 @@ class AzureOpenAIClient:
             APIError: If API error occurs after retries
         """
         try:
-            response = await self.client.chat.completions.create(
+            kwargs: Dict[str, Any] = {}
+            if response_format is not None:
+                kwargs["response_format"] = response_format
+
+            response = await _with_retry(lambda: self.client.chat.completions.create(
                 model=self.settings.AZURE_OPENAI_DEPLOYMENT_NAME,
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
-            )
+                max_tokens=max_tokens,
+                user=_PROMPT_CACHE_USER,
+                **kwargs
+            ))
 
             content = response.choices[0].message.content
             tokens_used = response.usage.total_tokens
@@ -152,12 +236,92 @@ class AzureOpenAIClient:
             logger.error(f"Unexpected error during chat completion: {e}")
             raise
 
-    @retry(
-        retry=retry_if_exception_type((RateLimitError, APIError)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        before_sleep=before_sleep_log(logger, logging.WARNING)
-    )
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ):
+        """
+        Stream a chat completion token-by-token (cuts time-to-first-token
+        from full-generation latency to the first chunk's arrival).
+
+        No retry wrapper: a stream that dies mid-generation must not be
+        silently replayed, since the consumer has already seen partial
+        output.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content' keys
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum tokens in response
+
+        Yields:
+            {"delta": str} for each content piece as it arrives, then a
+            final {"tokens_used": int} once the stream closes (0 if the
+            service omitted usage)
+        """
+        response = await self.client.chat.completions.create(
+            model=self.settings.AZURE_OPENAI_DEPLOYMENT_NAME,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            user=_PROMPT_CACHE_USER,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+
+        tokens_used = 0
+        async for chunk in response:
+            if chunk.usage is not None:
+                tokens_used = chunk.usage.total_tokens
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield {"delta": delta}
+
+        logger.debug(f"Streamed chat completion finished: {tokens_used} tokens")
+        yield {"tokens_used": tokens_used}
+
+    async def submit_batch(self, jsonl_path: str) -> str:
+        """
+        Upload a JSONL request file and create a Batch API job.
+
+        Intended for offline workloads (transcript replays, nightly
+        re-extraction, evals): batch jobs run at half the interactive
+        price with a 24h completion window. Interactive chat/embed paths
+        are unaffected.
+
+        Args:
+            jsonl_path: Path to a JSONL file with one request object per
+                line in the Batch API format
+
+        Returns:
+            The created batch job id
+        """
+        with open(jsonl_path, "rb") as f:
+            batch_file = await self.client.files.create(file=f, purpose="batch")
+
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+
+        logger.info(f"Submitted batch job {batch.id} ({jsonl_path})")
+        return batch.id
+
+    async def poll_batch(self, batch_id: str):
+        """
+        Retrieve the current status/metadata of a Batch API job.
+
+        Args:
+            batch_id: Id returned by submit_batch
+
+        Returns:
+            The batch object (status, counts, output_file_id when done)
+        """
+        return await self.client.batches.retrieve(batch_id)
+
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """
         Embed multiple texts in a single API call.
@@ -179,10 +343,10 @@ class AzureOpenAIClient:
             raise ValueError("Maximum 100 texts per batch")
 
         try:
-            response = await self.client.embeddings.create(
+            response = await _with_retry(lambda: self.client.embeddings.create(
                 input=texts,
                 model="text-embedding-ada-002"
-            )
+            ))
 
             embeddings = [item.embedding for item in response.data]
             logger.debug(f"Successfully embedded {len(texts)} texts in batch")
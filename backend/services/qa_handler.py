@@ -4,15 +4,17 @@ Q&A phase handler with RAG (Retrieval-Augmented Generation) pipeline.
 Pipeline: Question → Query Planning → Embed → Query VectorDB → Format Context → Generate Answer
 """
 
-import sys
-from pathlib import Path
+import asyncio
+import functools
+import re
 from typing import Dict, Any, List, Optional
 import logging
-import json
 
-# Add parent directory to path for local development
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+import numpy as np
+import orjson
+
 from models import ChatRequest, ChatResponse, Message, Source
+from services.llm_cache import get_answer_cache, get_cached_plan, store_plan
 from services.openai_client import get_openai_client
 from services.vector_store import get_vector_store
 from prompts.qa_prompt import build_qa_prompt, format_retrieved_chunks, QUERY_PLANNING_PROMPT
@@ -21,6 +23,18 @@ from config import get_backend_settings
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Settings are immutable after startup; resolve the cached singleton once
+# at import instead of once per request
+_SETTINGS = get_backend_settings()
+
+# QA answers only need recent conversational context; older turns add
+# input tokens (cost and prefill latency) without improving grounding,
+# which comes from the retrieved chunks
+MAX_HISTORY_TURNS = 6
+
+# Matches JSON wrapped in a markdown code fence (``` or ```json)
+_CODEBLOCK_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
 
 def clean_json_response(json_str: str) -> str:
     """
@@ -31,25 +45,17 @@ def clean_json_response(json_str: str) -> str:
     {"key": "value"}
     ```
 
+    One precompiled regex match replaces the startswith/endswith slicing
+    chain (fewer intermediate string allocations per call).
+
     Args:
         json_str: Raw JSON string from LLM
 
     Returns:
         Cleaned JSON string ready for parsing
     """
-    # Remove markdown code blocks
-    json_str = json_str.strip()
-
-    # Remove ```json ... ``` wrapper
-    if json_str.startswith("```json"):
-        json_str = json_str[7:]  # Remove ```json
-    elif json_str.startswith("```"):
-        json_str = json_str[3:]  # Remove ```
-
-    if json_str.endswith("```"):
-        json_str = json_str[:-3]  # Remove trailing ```
-
-    return json_str.strip()
+    m = _CODEBLOCK_RE.match(json_str)
+    return m.group(1) if m else json_str.strip()
 
 
 async def plan_query(user_message: str, openai_client) -> Dict[str, Any]:
@@ -72,6 +78,13 @@ async def plan_query(user_message: str, openai_client) -> Dict[str, Any]:
             "needs_comparison": bool
         }
     """
+    # Plans are deterministic at this temperature - identical messages
+    # reuse the cached plan and skip the LLM round-trip entirely
+    cached = get_cached_plan(user_message)
+    if cached is not None:
+        logger.info(f"Query plan (cached): {cached}")
+        return cached
+
     try:
         # Call LLM for query planning (low temperature for consistency)
         response = await openai_client.chat(
@@ -89,12 +102,13 @@ async def plan_query(user_message: str, openai_client) -> Dict[str, Any]:
         cleaned_json = clean_json_response(json_str)
 
         # Parse JSON
-        query_plan = json.loads(cleaned_json)
+        query_plan = orjson.loads(cleaned_json)
 
         logger.info(f"Query plan: {query_plan}")
+        store_plan(user_message, query_plan)
         return query_plan
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.warning(f"Failed to parse query plan JSON: {e}. Response: {json_str}")
         # Fallback to empty plan (no special filtering)
         return {
@@ -114,6 +128,195 @@ async def plan_query(user_message: str, openai_client) -> Dict[str, Any]:
         }
 
 
+async def _prepare_qa_turn(request: ChatRequest):
+    """
+    Run the retrieval pipeline shared by the blocking and streaming paths.
+
+    Covers plan+embed, the semantic answer cache, the concurrent retrieval
+    ladder, and prompt/message construction - everything up to (but not
+    including) the answer-generation LLM call.
+
+    Args:
+        request: Chat request with user question, complete user_data, and history
+
+    Returns:
+        Tuple of (cached_response, prep) - exactly one is None. On a
+        semantic-cache hit cached_response is the finished ChatResponse;
+        otherwise prep is a dict carrying the generation messages plus the
+        state needed to finish the turn after generation.
+    """
+    # Get clients
+    openai_client = get_openai_client()
+    vector_store = get_vector_store()
+
+    # Query planning (LLM decides what filters to use) and question
+    # embedding both depend only on the message - run them concurrently
+    # so the two network round-trips overlap
+    logger.info("Planning query and embedding question...")
+    query_plan, question_embedding = await asyncio.gather(
+        plan_query(request.message, openai_client),
+        openai_client.embed(request.message)
+    )
+
+    # Semantic answer cache: a near-identical question from a user with
+    # the same HMO/tier/language reuses the generated answer outright
+    answer_cache = get_answer_cache()
+    cached_answer = answer_cache.get(
+        question_embedding, request.user_data.hmo, request.user_data.tier, request.language
+    )
+    if cached_answer is not None:
+        answer, sources = cached_answer
+        return ChatResponse(
+            response=answer,
+            phase="qa",
+            user_data=request.user_data,
+            missing_fields=[],
+            sources=sources,
+            metadata={
+                "tokens_used": 0,
+                "chunks_retrieved": len(sources),
+                "retrieval_strategy": "semantic_cache"
+            }
+        ), None
+
+    # Query vector store using the plan
+    # Apply tier filter only if plan doesn't say to ignore it
+    should_ignore_tier = query_plan.get("ignore_tier") or query_plan.get("needs_comparison")
+    tier_filter = None if should_ignore_tier else request.user_data.tier
+
+    logger.info(
+        f"Querying vector store: hmo={request.user_data.hmo}, tier={tier_filter}, "
+        f"type={query_plan.get('chunk_type')}, category={query_plan.get('category')}"
+    )
+
+    # Build retrieval strategy description
+    strategy_parts = [f"hmo={request.user_data.hmo}"]
+    if tier_filter:
+        strategy_parts.append(f"tier={tier_filter}")
+    if query_plan.get("chunk_type"):
+        strategy_parts.append(f"type={query_plan['chunk_type']}")
+    if query_plan.get("category"):
+        strategy_parts.append(f"category={query_plan['category']}")
+
+    # Filter sets in priority order: planned → hmo only → global.
+    # Run the distinct ones concurrently in the executor (each Chroma
+    # query is a separate HNSW search) and take the first non-empty in
+    # priority order, instead of paying up to three sequential searches
+    # when the stricter filters come back empty.
+    filter_sets = [
+        ("planned (" + ", ".join(strategy_parts) + ")", {
+            "hmo": request.user_data.hmo,
+            "tier": tier_filter,
+            "chunk_type": query_plan.get("chunk_type"),
+            "category": query_plan.get("category"),
+        }),
+        ("fallback (hmo only)", {
+            "hmo": request.user_data.hmo,
+            "tier": None,
+            "chunk_type": None,
+            "category": None,
+        }),
+        ("global (no filters)", {
+            "hmo": None,
+            "tier": None,
+            "chunk_type": None,
+            "category": None,
+        }),
+    ]
+    # Drop consecutive duplicates (the planned set degenerates to
+    # hmo-only when the plan carries no filters)
+    filter_sets = [fs for i, fs in enumerate(filter_sets)
+                   if i == 0 or fs[1] != filter_sets[i - 1][1]]
+
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*[
+        loop.run_in_executor(None, functools.partial(
+            vector_store.query,
+            query_embedding=question_embedding,
+            n_results=_SETTINGS.RAG_TOP_K,
+            **filters
+        ))
+        for _, filters in filter_sets
+    ])
+
+    retrieved_chunks, retrieval_strategy = results[0], filter_sets[0][0]
+    num_chunks = len(retrieved_chunks.get("documents", []))
+    for (strategy, _), chunks in zip(filter_sets, results):
+        count = len(chunks.get("documents", []))
+        if count > 0:
+            retrieved_chunks, retrieval_strategy, num_chunks = chunks, strategy, count
+            break
+
+    logger.info(f"Final retrieval: {num_chunks} chunks using {retrieval_strategy}")
+
+    # Format retrieved chunks as context
+    logger.info("Formatting context...")
+    formatted_context = format_retrieved_chunks(retrieved_chunks, request.language)
+
+    # Build system prompt with user profile + context
+    logger.info("Building prompt...")
+    system_prompt = build_qa_prompt(
+        request.user_data,
+        formatted_context,
+        request.language
+    )
+
+    # Build messages in one expression: system prompt, recent history
+    # (hard-capped - see MAX_HISTORY_TURNS), current question
+    messages = [
+        {"role": "system", "content": system_prompt},
+        *({"role": m.role, "content": m.content}
+          for m in request.conversation_history[-MAX_HISTORY_TURNS:]),
+        {"role": "user", "content": request.message},
+    ]
+
+    return None, {
+        "openai_client": openai_client,
+        "answer_cache": answer_cache,
+        "question_embedding": question_embedding,
+        "messages": messages,
+        "retrieved_chunks": retrieved_chunks,
+        "num_chunks": num_chunks,
+        "retrieval_strategy": retrieval_strategy,
+    }
+
+
+def _finish_qa_turn(request: ChatRequest, prep: Dict[str, Any], answer: str,
+                    tokens_used: int) -> ChatResponse:
+    """
+    Build the final ChatResponse and populate the semantic answer cache.
+
+    Shared tail of the blocking and streaming paths, once the full answer
+    text is in hand.
+    """
+    sources = build_sources_list(prep["retrieved_chunks"])
+
+    # Store for future near-duplicate questions
+    prep["answer_cache"].put(
+        prep["question_embedding"], request.user_data.hmo, request.user_data.tier,
+        request.language, answer, sources
+    )
+
+    logger.info(
+        f"Q&A phase complete: {prep['num_chunks']} chunks retrieved, "
+        f"{len(sources)} sources, tokens={tokens_used}"
+    )
+
+    return ChatResponse(
+        response=answer,
+        phase="qa",
+        user_data=request.user_data,  # Return unchanged user data
+        missing_fields=[],
+        sources=sources,
+        metadata={
+            "tokens_used": tokens_used,
+            "chunks_retrieved": prep["num_chunks"],
+            "top_k": _SETTINGS.RAG_TOP_K,
+            "retrieval_strategy": prep["retrieval_strategy"]
+        }
+    )
+
+
 async def handle_qa_phase(request: ChatRequest) -> ChatResponse:
     """
     Handle the Q&A phase using RAG pipeline.
@@ -133,149 +336,69 @@ async def handle_qa_phase(request: ChatRequest) -> ChatResponse:
         ChatResponse with answer, sources, and updated user_data
     """
     try:
-        settings = get_backend_settings()
-
-        # Get clients
-        openai_client = get_openai_client()
-        vector_store = get_vector_store()
-
-        # Query Planning (LLM decides what filters to use)
-        logger.info("Planning query...")
-        query_plan = await plan_query(request.message, openai_client)
-
-        # Embed the question
-        logger.info("Embedding question...")
-        question_embedding = await openai_client.embed(request.message)
+        cached_response, prep = await _prepare_qa_turn(request)
+        if cached_response is not None:
+            return cached_response
 
-        # Query vector store using the plan
-        # Apply tier filter only if plan doesn't say to ignore it
-        should_ignore_tier = query_plan.get("ignore_tier") or query_plan.get("needs_comparison")
-        tier_filter = None if should_ignore_tier else request.user_data.tier
-
-        logger.info(
-            f"Querying vector store: hmo={request.user_data.hmo}, tier={tier_filter}, "
-            f"type={query_plan.get('chunk_type')}, category={query_plan.get('category')}"
+        # Generate answer using LLM
+        logger.info("Generating answer...")
+        response = await prep["openai_client"].chat(
+            messages=prep["messages"],
+            temperature=0.3,  # Lower temperature for factual answers
+            max_tokens=800
         )
 
-        retrieved_chunks = vector_store.query(
-            query_embedding=question_embedding,
-            hmo=request.user_data.hmo,
-            tier=tier_filter,
-            chunk_type=query_plan.get("chunk_type"),
-            category=query_plan.get("category"),
-            n_results=settings.RAG_TOP_K
-        )
+        return _finish_qa_turn(request, prep, response["content"], response["tokens_used"])
 
-        num_chunks = len(retrieved_chunks.get("documents", []))
-
-        # Build retrieval strategy description
-        strategy_parts = [f"hmo={request.user_data.hmo}"]
-        if tier_filter:
-            strategy_parts.append(f"tier={tier_filter}")
-        if query_plan.get("chunk_type"):
-            strategy_parts.append(f"type={query_plan['chunk_type']}")
-        if query_plan.get("category"):
-            strategy_parts.append(f"category={query_plan['category']}")
-
-        retrieval_strategy = "planned (" + ", ".join(strategy_parts) + ")"
-
-        logger.info(f"Retrieved {num_chunks} chunks using {retrieval_strategy}")
-
-        # Fallback if no chunks found (try with fewer filters)
-        if num_chunks == 0:
-            logger.info("No results with planned filters, trying relaxed (hmo only)...")
-            retrieved_chunks = vector_store.query(
-                query_embedding=question_embedding,
-                hmo=request.user_data.hmo,
-                tier=None,
-                chunk_type=None,
-                category=None,
-                n_results=settings.RAG_TOP_K
-            )
-            num_chunks = len(retrieved_chunks.get("documents", []))
-            retrieval_strategy = "fallback (hmo only)"
-
-        # Final fallback - global search
-        if num_chunks == 0:
-            logger.info("No results with fallback, trying global search...")
-            retrieved_chunks = vector_store.query(
-                query_embedding=question_embedding,
-                hmo=None,
-                tier=None,
-                chunk_type=None,
-                category=None,
-                n_results=settings.RAG_TOP_K
-            )
-            num_chunks = len(retrieved_chunks.get("documents", []))
-            retrieval_strategy = "global (no filters)"
-
-        logger.info(f"Final retrieval: {num_chunks} chunks using {retrieval_strategy}")
-
-        # Format retrieved chunks as context
-        logger.info("Formatting context...")
-        formatted_context = format_retrieved_chunks(retrieved_chunks, request.language)
-
-        # Build system prompt with user profile + context
-        logger.info("Building prompt...")
-        system_prompt = build_qa_prompt(
-            request.user_data,
-            formatted_context,
-            request.language
-        )
+    except Exception as e:
+        logger.error(f"Q&A phase error: {e}")
+        raise
 
-        # Build messages for LLM
-        messages = [
-            {"role": "system", "content": system_prompt}
-        ]
 
-        # Add conversation history
-        for msg in request.conversation_history:
-            messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
+async def handle_qa_phase_stream(request: ChatRequest):
+    """
+    Streaming variant of handle_qa_phase.
 
-        # Add current question
-        messages.append({
-            "role": "user",
-            "content": request.message
-        })
+    Same retrieval pipeline, but the answer is generated with chat_stream
+    so the first tokens reach the client while the rest are still being
+    decoded.
 
-        # Generate answer using LLM
-        logger.info("Generating answer...")
-        response = await openai_client.chat(
-            messages=messages,
+    Args:
+        request: Chat request with user question, complete user_data, and history
+
+    Yields:
+        {"delta": str} per generated text piece, then a final
+        {"done": True, "response": <ChatResponse as dict>} event carrying
+        the complete answer, sources, and metadata
+    """
+    try:
+        cached_response, prep = await _prepare_qa_turn(request)
+        if cached_response is not None:
+            # Cache hits arrive whole; emit the answer as a single delta so
+            # the client renders it through the same code path
+            yield {"delta": cached_response.response}
+            yield {"done": True, "response": cached_response.model_dump()}
+            return
+
+        logger.info("Generating answer (streaming)...")
+        parts: List[str] = []
+        tokens_used = 0
+        async for event in prep["openai_client"].chat_stream(
+            messages=prep["messages"],
             temperature=0.3,  # Lower temperature for factual answers
             max_tokens=800
-        )
-
-        answer = response["content"]
-        tokens_used = response["tokens_used"]
+        ):
+            if "delta" in event:
+                parts.append(event["delta"])
+                yield event
+            else:
+                tokens_used = event["tokens_used"]
 
-        # Build sources list from retrieved chunks
-        sources = build_sources_list(retrieved_chunks)
-
-        logger.info(
-            f"Q&A phase complete: {num_chunks} chunks retrieved, "
-            f"{len(sources)} sources, tokens={tokens_used}"
-        )
-
-        return ChatResponse(
-            response=answer,
-            phase="qa",
-            user_data=request.user_data,  # Return unchanged user data
-            missing_fields=[],
-            sources=sources,
-            metadata={
-                "tokens_used": tokens_used,
-                "chunks_retrieved": num_chunks,
-                "top_k": settings.RAG_TOP_K,
-                "retrieval_strategy": retrieval_strategy
-            }
-        )
+        response = _finish_qa_turn(request, prep, "".join(parts), tokens_used)
+        yield {"done": True, "response": response.model_dump()}
 
     except Exception as e:
-        logger.error(f"Q&A phase error: {e}")
+        logger.error(f"Q&A phase (stream) error: {e}")
         raise
 
 
@@ -289,33 +412,35 @@ def build_sources_list(retrieved_chunks: Dict[str, Any]) -> List[Source]:
     Returns:
         List of Source objects
     """
-    sources = []
-
     if not retrieved_chunks or not retrieved_chunks.get("metadatas"):
-        return sources
+        return []
 
     metadatas = retrieved_chunks["metadatas"]
     distances = retrieved_chunks.get("distances", [])
 
-    for i, metadata in enumerate(metadatas):
-        # Calculate relevance score (distance to similarity)
-        # ChromaDB uses cosine distance (0 = identical, 2 = opposite)
-        # Convert to similarity score (0-1, where 1 = most similar)
-        distance = distances[i] if i < len(distances) else 1.0
-        relevance_score = max(0.0, 1.0 - (distance / 2.0))
-
-        source = Source(
-            type=metadata.get("type", "unknown"),
-            category=metadata.get("category", "unknown"),
-            service=metadata.get("service"),
-            hmo=metadata.get("hmo", "unknown"),
-            tier=metadata.get("tier", "unknown"),
-            relevance_score=round(relevance_score, 3)
+    # Convert cosine distance (0 = identical, 2 = opposite) to a 0-1
+    # similarity score, vectorized; missing distances default to 1.0.
+    # argsort on the negated scores replaces the Python-level sort with
+    # per-element attribute access, and yields sources already ordered
+    # highest-relevance first.
+    dists = np.fromiter(
+        (distances[i] if i < len(distances) else 1.0 for i in range(len(metadatas))),
+        dtype=np.float64,
+        count=len(metadatas)
+    )
+    scores = np.clip(1.0 - dists / 2.0, 0.0, 1.0)
+    order = np.argsort(-scores, kind="stable")
+
+    # model_construct skips validation - safe here because the fields
+    # come straight from our own ingested metadata, not client input
+    return [
+        Source.model_construct(
+            type=metadatas[i].get("type", "unknown"),
+            category=metadatas[i].get("category", "unknown"),
+            service=metadatas[i].get("service"),
+            hmo=metadatas[i].get("hmo", "unknown"),
+            tier=metadatas[i].get("tier", "unknown"),
+            relevance_score=round(float(scores[i]), 3)
         )
-
-        sources.append(source)
-
-    # Sort by relevance score (highest first)
-    sources.sort(key=lambda x: x.relevance_score, reverse=True)
-
-    return sources
+        for i in order
+    ]
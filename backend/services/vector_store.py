@@ -4,20 +4,32 @@ ChromaDB vector store client for RAG retrieval.
 Provides query functionality with metadata filtering for HMO and tier.
 """
 
-import sys
-from pathlib import Path
-from typing import List, Dict, Any, Optional
+import functools
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Union
 import logging
-import chromadb
-from chromadb.config import Settings as ChromaSettings
 
-# Add parent directory to path for local development
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+import numpy as np
+
+# chromadb is imported lazily inside VectorStoreClient.__init__: it pulls
+# in onnxruntime and sqlite extensions worth hundreds of milliseconds of
+# import time, which processes that never touch the vector store (and
+# --reload cycles) shouldn't pay.
+
 from config import get_backend_settings
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Query results are deterministic for a given (embedding, filters) pair,
+# so repeated questions can skip the HNSW search entirely
+_QUERY_CACHE_MAX = 1000
+
+# Distinguishes "not cached yet" from a cached None where-filter
+_MISSING = object()
+
 
 class VectorStoreClient:
     """
@@ -30,7 +42,10 @@ class VectorStoreClient:
     """
 
     def __init__(self):
-        """Initialize and connect to ChromaDB immediately."""
+        """Initialize the ChromaDB client (the collection opens lazily)."""
+        import chromadb
+        from chromadb.config import Settings as ChromaSettings
+
         self.settings = get_backend_settings()
 
         try:
@@ -54,54 +69,87 @@ class VectorStoreClient:
                     settings=ChromaSettings(anonymized_telemetry=False)
                 )
 
-            # Get existing collection
-            self.collection = self.client.get_collection(
-                name=self.settings.VECTOR_DB_COLLECTION_NAME
-            )
-
-            count = self.collection.count()
-            logger.info(
-                f"Vector store initialized: collection '{self.settings.VECTOR_DB_COLLECTION_NAME}' "
-                f"with {count} chunks"
-            )
+            # The collection handle itself is a cached_property: opening
+            # it (and the count stat) is deferred until the first query or
+            # health check, so processes that construct the client but
+            # never search skip the collection round-trip at startup.
+
+            # LRU cache over query results, keyed by the embedding bytes
+            # plus the filter tuple (an instance-level OrderedDict, same
+            # pattern as the query-plan cache in llm_cache)
+            self._query_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+            self._query_cache_hits = 0
+            self._query_cache_misses = 0
+
+            # Single-flight bookkeeping: queries run on executor threads,
+            # so concurrent identical requests (several sessions asking
+            # the same FAQ in a burst) rendezvous on one Future instead of
+            # each running its own HNSW search
+            self._inflight: Dict[tuple, Future] = {}
+            self._inflight_lock = threading.Lock()
+
+            # Where-filters memoized by filter values: hmo/tier/category/
+            # type come from closed enums, so only a handful of distinct
+            # filter dicts ever exist - build each once and reuse it
+            # (Chroma only reads them) instead of reallocating the dict
+            # tree on every query
+            self._where_filters: Dict[tuple, Optional[Dict[str, Any]]] = {}
+
+            # Metadata histograms, built lazily on first get_stats() call
+            # (the backend never writes to the collection, so they stay
+            # valid for the process lifetime; see refresh_stats)
+            self._stats: Optional[Dict[str, Any]] = None
 
         except Exception as e:
             logger.error(f"Failed to initialize vector store: {e}")
             raise
 
-    def query(
-        self,
-        query_embedding: List[float],
-        hmo: Optional[str] = None,
-        tier: Optional[str] = None,
-        category: Optional[str] = None,
-        chunk_type: Optional[str] = None,
-        n_results: Optional[int] = None
-    ) -> Dict[str, Any]:
+    @functools.cached_property
+    def collection(self):
         """
-        Query vector store with optional metadata filters.
+        The ChromaDB collection handle, opened on first access.
 
-        All filters are combined with AND logic using $and operator.
+        cached_property stores the handle on the instance after the first
+        lookup, so subsequent accesses are a plain attribute read.
+        """
+        collection = self.client.get_collection(
+            name=self.settings.VECTOR_DB_COLLECTION_NAME
+        )
+
+        # One-shot upgrade for collections ingested before the HNSW
+        # settings were added at creation: search_ef is the only knob
+        # that can change after build, and modify replaces the whole
+        # metadata dict, so merge rather than overwrite. Guarded -
+        # a failure here must not block the first query.
+        try:
+            metadata = collection.metadata or {}
+            if metadata.get("hnsw:search_ef") != 64:
+                collection.modify(metadata={**metadata, "hnsw:search_ef": 64})
+                logger.info("Raised hnsw:search_ef to 64 on existing collection")
+        except Exception as e:
+            logger.warning(f"Could not update hnsw:search_ef: {e}")
 
-        Args:
-            query_embedding: Embedding vector to search for
-            hmo: Filter by HMO (maccabi, meuhedet, clalit, or None for all)
-            tier: Filter by tier (gold, silver, bronze, or None for all)
-            category: Filter by category (dental, optometry, etc.)
-            chunk_type: Filter by type (context, benefit, contact)
-            n_results: Number of results to return (default from settings)
+        logger.info(
+            f"Opened collection '{self.settings.VECTOR_DB_COLLECTION_NAME}'"
+        )
+        return collection
 
-        Returns:
-            Dictionary with:
-                - documents: List of matching text chunks
-                - metadatas: List of metadata dicts
-                - distances: List of similarity distances (lower is better)
-                - ids: List of chunk IDs
+    def _build_where_filter(
+        self,
+        hmo: Optional[str],
+        tier: Optional[str],
+        category: Optional[str],
+        chunk_type: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
         """
-        if n_results is None:
-            n_results = self.settings.RAG_TOP_K
+        Build the metadata filter with explicit AND logic, memoized by the
+        filter values (see __init__).
+        """
+        filter_key = (hmo, tier, category, chunk_type)
+        where_filter = self._where_filters.get(filter_key, _MISSING)
+        if where_filter is not _MISSING:
+            return where_filter
 
-        # Build metadata filter with explicit AND logic
         where_conditions = []
 
         if hmo:
@@ -127,10 +175,90 @@ class VectorStoreClient:
             # Use $and operator for explicit AND logic
             where_filter = {"$and": where_conditions}
 
+        self._where_filters[filter_key] = where_filter
+        return where_filter
+
+    def query(
+        self,
+        query_embedding: Union[np.ndarray, List[float]],
+        hmo: Optional[str] = None,
+        tier: Optional[str] = None,
+        category: Optional[str] = None,
+        chunk_type: Optional[str] = None,
+        n_results: Optional[int] = None,
+        max_returned: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Query vector store with optional metadata filters.
+
+        All filters are combined with AND logic using $and operator.
+
+        Args:
+            query_embedding: Embedding vector to search for
+            hmo: Filter by HMO (maccabi, meuhedet, clalit, or None for all)
+            tier: Filter by tier (gold, silver, bronze, or None for all)
+            category: Filter by category (dental, optometry, etc.)
+            chunk_type: Filter by type (context, benefit, contact)
+            n_results: Number of results to return (default from settings)
+            max_returned: Optional cap on how many results the caller
+                actually consumes; caps n_results up front so payload
+                bytes between Chroma and the backend scale with what is
+                displayed, not with RAG_TOP_K
+
+        Returns:
+            Dictionary with:
+                - documents: List of matching text chunks
+                - metadatas: List of metadata dicts
+                - distances: List of similarity distances (lower is better)
+                - ids: List of chunk IDs
+        """
+        if n_results is None:
+            n_results = self.settings.RAG_TOP_K
+        if max_returned is not None:
+            n_results = min(n_results, max_returned)
+
+        # One conversion to float32 up front: the same array serves as the
+        # cache key (via its bytes) and goes straight to Chroma, which
+        # accepts ndarrays and then skips its own per-element list
+        # conversion. No-op when the caller already passes float32.
+        embedding = np.asarray(query_embedding, dtype=np.float32)
+
+        # Cache lookup: float32 bytes make the embedding hashable without
+        # a 1536-element tuple, and identical questions produce identical
+        # embeddings so repeats skip the HNSW search
+        cache_key = (
+            embedding.tobytes(),
+            hmo, tier, category, chunk_type, n_results
+        )
+        # Cache and single-flight check under one lock: the first caller
+        # for a key becomes the owner and runs the search; concurrent
+        # duplicates block on the owner's Future instead of repeating it
+        pending = None
+        with self._inflight_lock:
+            cached = self._query_cache.get(cache_key)
+            if cached is not None:
+                self._query_cache.move_to_end(cache_key)
+                self._query_cache_hits += 1
+                logger.debug("Query cache hit")
+                return cached
+            pending = self._inflight.get(cache_key)
+            if pending is None:
+                future: Future = Future()
+                self._inflight[cache_key] = future
+
+        if pending is not None:
+            logger.debug("Coalescing duplicate in-flight query")
+            self._query_cache_hits += 1
+            return pending.result()
+
+        self._query_cache_misses += 1
+
+        where_filter = self._build_where_filter(hmo, tier, category, chunk_type)
+
         try:
             # Query ChromaDB
             results = self.collection.query(
-                query_embeddings=[query_embedding],
+                query_embeddings=embedding.reshape(1, -1),
                 n_results=n_results,
                 where=where_filter,
                 include=["documents", "metadatas", "distances"]
@@ -149,11 +277,87 @@ class VectorStoreClient:
                 f"(filters: hmo={hmo}, tier={tier}, category={category}, type={chunk_type})"
             )
 
+            with self._inflight_lock:
+                self._query_cache[cache_key] = flattened_results
+                if len(self._query_cache) > _QUERY_CACHE_MAX:
+                    self._query_cache.popitem(last=False)
+            future.set_result(flattened_results)
+
             return flattened_results
 
         except Exception as e:
+            future.set_exception(e)
             logger.error(f"Query failed: {e}")
             raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+
+    def query_many(
+        self,
+        query_embeddings: Union[np.ndarray, List[List[float]]],
+        hmo: Optional[str] = None,
+        tier: Optional[str] = None,
+        category: Optional[str] = None,
+        chunk_type: Optional[str] = None,
+        n_results: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query with several embeddings in a single ChromaDB call.
+
+        Chroma's query API natively accepts multiple query vectors, so N
+        sub-questions cost one RPC and one index-walk setup instead of N.
+        Filters apply to all vectors (same semantics as query()).
+
+        Args:
+            query_embeddings: List of embedding vectors to search for
+            hmo: Filter by HMO (maccabi, meuhedet, clalit, or None for all)
+            tier: Filter by tier (gold, silver, bronze, or None for all)
+            category: Filter by category (dental, optometry, etc.)
+            chunk_type: Filter by type (context, benefit, contact)
+            n_results: Number of results per vector (default from settings)
+
+        Returns:
+            One result dict per input embedding, each with the same
+            documents/metadatas/distances/ids shape query() returns
+        """
+        if n_results is None:
+            n_results = self.settings.RAG_TOP_K
+
+        where_filter = self._build_where_filter(hmo, tier, category, chunk_type)
+
+        # Single float32 conversion (see query); Chroma takes the 2D array
+        # as-is
+        embeddings = np.asarray(query_embeddings, dtype=np.float32)
+
+        try:
+            results = self.collection.query(
+                query_embeddings=embeddings,
+                n_results=n_results,
+                where=where_filter,
+                include=["documents", "metadatas", "distances"]
+            )
+
+            flattened = [
+                {
+                    "documents": results["documents"][i] if results["documents"] else [],
+                    "metadatas": results["metadatas"][i] if results["metadatas"] else [],
+                    "distances": results["distances"][i] if results["distances"] else [],
+                    "ids": results["ids"][i] if results["ids"] else []
+                }
+                for i in range(len(query_embeddings))
+            ]
+
+            logger.debug(
+                f"Batched query for {len(query_embeddings)} vectors "
+                f"(filters: hmo={hmo}, tier={tier}, category={category}, type={chunk_type})"
+            )
+
+            return flattened
+
+        except Exception as e:
+            logger.error(f"Batched query failed: {e}")
+            raise
 
     def health_check(self) -> bool:
         """
@@ -176,65 +380,70 @@ class VectorStoreClient:
             logger.error(f"Health check failed: {e}")
             return False
 
+    def refresh_stats(self) -> Dict[str, Any]:
+        """
+        Rebuild the metadata histograms with one full collection scan.
+
+        Counter over a generator does the tallying at C level instead of
+        four dict-get-increment statements per chunk. Only needed after an
+        out-of-band re-ingest; get_stats() serves the cached result.
+
+        Returns:
+            The rebuilt stats dictionary (same shape as get_stats)
+        """
+        count = self.collection.count()
+        sample = self.collection.get(limit=count, include=["metadatas"])
+        metadatas = sample["metadatas"]
+
+        self._stats = {
+            "status": "initialized",
+            "total_chunks": count,
+            "by_type": dict(Counter(m.get("type", "unknown") for m in metadatas)),
+            "by_hmo": dict(Counter(m.get("hmo", "unknown") for m in metadatas)),
+            "by_tier": dict(Counter(m.get("tier", "unknown") for m in metadatas)),
+            "by_category": dict(Counter(m.get("category", "unknown") for m in metadatas)),
+        }
+        return self.get_stats()
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the vector store.
 
+        The histograms are scanned once and cached for the process
+        lifetime (the backend is a pure reader); only the query-cache
+        counters change between calls.
+
         Returns:
             Dictionary with collection stats
         """
         try:
-            count = self.collection.count()
-
-            # Get sample to analyze metadata distribution
-            sample = self.collection.get(limit=count, include=["metadatas"])
-
-            # Count by type
-            type_counts = {}
-            hmo_counts = {}
-            tier_counts = {}
-            category_counts = {}
-
-            for metadata in sample["metadatas"]:
-                # Count types
-                chunk_type = metadata.get("type", "unknown")
-                type_counts[chunk_type] = type_counts.get(chunk_type, 0) + 1
-
-                # Count HMOs
-                hmo = metadata.get("hmo", "unknown")
-                hmo_counts[hmo] = hmo_counts.get(hmo, 0) + 1
-
-                # Count tiers
-                tier = metadata.get("tier", "unknown")
-                tier_counts[tier] = tier_counts.get(tier, 0) + 1
-
-                # Count categories
-                category = metadata.get("category", "unknown")
-                category_counts[category] = category_counts.get(category, 0) + 1
-
-            return {
-                "status": "initialized",
-                "total_chunks": count,
-                "by_type": type_counts,
-                "by_hmo": hmo_counts,
-                "by_tier": tier_counts,
-                "by_category": category_counts
+            if self._stats is None:
+                self.refresh_stats()
+
+            stats = dict(self._stats)
+            stats["query_cache"] = {
+                "hits": self._query_cache_hits,
+                "misses": self._query_cache_misses,
+                "size": len(self._query_cache)
             }
+            return stats
 
         except Exception as e:
             logger.error(f"Failed to get stats: {e}")
             return {"status": "error", "error": str(e)}
 
 
-# Singleton instance
-_vector_store: Optional[VectorStoreClient] = None
-
-
+@functools.cache
 def get_vector_store() -> VectorStoreClient:
     """
     Get or create the singleton vector store client instance.
 
-    Automatically initializes on first call.
+    Automatically initializes on first call. functools.cache replaces the
+    global-and-None-check idiom: subsequent lookups are a C-level dict
+    hit. First-call construction is not serialized - concurrent first
+    callers may each build a client, with one result kept - which is
+    harmless here since __init__ only opens handles and the collection
+    itself is resolved lazily.
 
     Returns:
         VectorStoreClient instance
@@ -242,7 +451,4 @@ def get_vector_store() -> VectorStoreClient:
     Raises:
         Exception: If initialization fails
     """
-    global _vector_store
-    if _vector_store is None:
-        _vector_store = VectorStoreClient()
-    return _vector_store
+    return VectorStoreClient()
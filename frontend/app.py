@@ -34,156 +34,35 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better chat UI
-st.markdown("""
-<style>
-    /* 1. Main App Background */
-    .stApp {
-        background-color: #212121;
-    }
-
-    /* 2. Sidebar Styling */
-    [data-testid="stSidebar"] {
-        background-color: #1e1e2e;
-    }
-    [data-testid="stSidebar"] * {
-        color: #ffffff !important;
-    }
-    [data-testid="stSidebar"] .element-container, 
-    [data-testid="stSidebar"] h1, 
-    [data-testid="stSidebar"] h2, 
-    [data-testid="stSidebar"] p, 
-    [data-testid="stSidebar"] .stMarkdown {
-        text-align: center !important;
-    }
-
-    /* 3. Header Styling */
-    header[data-testid="stHeader"] {
-        background-color: #1e1e2e !important;
-    }
-
-    /* ---------------------------------------------------- */
-    /* CHAT INPUT STYLING - THE FIX                         */
-    /* ---------------------------------------------------- */
-
-    /* A. Target the Sticky Bottom Container */
-    /* This handles the large white strip at the bottom */
-    .stBottom, 
-    div[data-testid="stBottom"],
-    div[data-testid="stBottom"] > div {
-        background-color: transparent !important; /* Make it see-through */
-        border-top: none !important;
-    }
-
-    /* B. The Chat Input Wrapper */
-    /* Make this transparent so no white box sits behind the rounded pill */
-    div[data-testid="stChatInput"] {
-        background-color: transparent !important;
-    }
-
-    /* C. The Input "Pill" (The rounded shape) */
-    /* We apply the dark color HERE, on the specific rounded element */
-    div[data-testid="stChatInput"] > div {
-        background-color: #2d2d3d !important; /* Dark Grey */
-        color: #ffffff !important;
-        border-color: #3d3d4d !important;
-        border-radius: 20px !important; 
-    }
-
-    /* D. The Text Area inside the pill */
-    div[data-testid="stChatInput"] textarea {
-        background-color: transparent !important; /* Let the pill color show through */
-        color: #ffffff !important;
-    }
-
-    /* E. The Placeholder Text */
-    div[data-testid="stChatInput"] textarea::placeholder {
-        color: #b0b0b0 !important;
-    }
-    
-    /* F. The Send Button */
-    div[data-testid="stChatInput"] button {
-        color: #4CAF50 !important;
-    }
-    div[data-testid="stChatInput"] button:hover {
-        color: #45a049 !important;
-    }
-
-    /* ---------------------------------------------------- */
-    /* MESSAGE BUBBLES                                      */
-    /* ---------------------------------------------------- */
-    .stChatMessage {
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin-bottom: 1rem;
-    }
-
-    /* Chat message text - white for readability on dark background */
-    .stChatMessage p,
-    .stChatMessage div,
-    .stChatMessage span {
-        color: #ffffff !important;
-    }
-
-    div[data-testid="chatAvatarIcon-user"] {
-        background-color: #bbdefb !important;
-    }
-
-    /* Main chat title - white and centered */
-    .main h1 {
-        text-align: center !important;
-        color: #ffffff !important;
-    }
-
-    /* Override light mode defaults */
-    .main .block-container h1 {
-        color: #ffffff !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Stylesheets live in static/ and are read once per process via
+# st.cache_resource; each rerun injects the cached string instead of
+# re-parsing a multi-kilobyte literal embedded in the script
+_STATIC_DIR = Path(__file__).parent / "static"
 
 
-def apply_rtl_styling():
-    """Apply RTL (right-to-left) styling for Hebrew language."""
-    st.markdown("""
-    <style>
-        /* Main content area RTL */
-        .main .block-container {
-            direction: rtl;
-            text-align: right;
-        }
+@st.cache_resource(show_spinner=False)
+def _load_css(name: str) -> str:
+    """Read a stylesheet from static/ once; cached for the process."""
+    return (_STATIC_DIR / name).read_text(encoding="utf-8")
 
-        /* Sidebar content RTL */
-        [data-testid="stSidebar"] > div {
-            direction: rtl;
-            text-align: right;
-        }
 
-        /* Chat messages RTL */
-        .stChatMessage {
-            direction: rtl;
-            text-align: right;
-        }
+def _inject_css(name: str):
+    """Inject a cached stylesheet into the page.
 
-        /* Chat input RTL */
-        .stChatInputContainer textarea {
-            direction: rtl;
-            text-align: right;
-        }
+    Runs on every rerun on purpose: Streamlit rebuilds the DOM per rerun,
+    so a style element gated behind session_state would disappear after
+    the first interaction.
+    """
+    st.markdown(f"<style>{_load_css(name)}</style>", unsafe_allow_html=True)
 
-        /* Title and headers RTL */
-        h1, h2, h3, h4, h5, h6 {
-            direction: rtl;
-            text-align: right;
-        }
 
-        /* Info boxes RTL */
-        .stAlert {
-            direction: rtl;
-            text-align: right;
-        }
-    </style>
-    """, unsafe_allow_html=True)
+# Custom CSS for better chat UI
+_inject_css("theme.css")
+
+
+def apply_rtl_styling():
+    """Apply RTL (right-to-left) styling for Hebrew language."""
+    _inject_css("rtl.css")
 
 
 def initialize_session_state():
@@ -192,6 +71,12 @@ def initialize_session_state():
     if "conversation_history" not in st.session_state:
         st.session_state.conversation_history = []
 
+    # Parallel role/content-only view of the history, maintained
+    # incrementally so each turn sends it as-is instead of rebuilding an
+    # O(N) stripped copy (the display list also carries sources)
+    if "api_history" not in st.session_state:
+        st.session_state.api_history = []
+
     if "user_data" not in st.session_state:
         st.session_state.user_data = {
             "name": None,
@@ -286,15 +171,25 @@ def show_language_selection():
     return False
 
 
-def check_backend_health(api_client):
+@st.cache_data(ttl=5, show_spinner=False)
+def check_backend_health(backend_url: str):
     """
     Check if backend is healthy.
 
+    Cached for 5 seconds: Streamlit reruns the whole script on every
+    widget event, and without the TTL each rerun would cost a full HTTP
+    round-trip to /api/v1/health. Takes the URL rather than the client
+    because st.cache_data needs hashable arguments; the pooled client is
+    pulled inside.
+
+    Args:
+        backend_url: Base URL of the FastAPI backend
+
     Returns:
         tuple: (is_healthy: bool, status_text: str)
     """
     try:
-        health_data = api_client.check_health()
+        health_data = get_api_client(backend_url).check_health()
         status = health_data.get("status", "unknown")
 
         if status == "healthy":
@@ -302,7 +197,7 @@ def check_backend_health(api_client):
         else:
             return False, f"⚠️ Backend {status.title()}"
 
-    except Exception as e:
+    except Exception:
         return False, "❌ Backend Offline"
 
 
@@ -311,6 +206,11 @@ def render_sidebar():
 
     with st.sidebar:
         st.title("Medical Assistant")
+
+        # Backend status (TTL-cached, so reruns don't hammer /health)
+        _, health_text = check_backend_health(st.session_state.backend_url)
+        st.caption(health_text)
+
        # User profile display
         st.divider()
         st.subheader("👤 User Profile")
@@ -358,6 +258,7 @@ def render_sidebar():
         # Reset button
         if st.button("🔄 Restart Chat", type="secondary", use_container_width=True):
             st.session_state.conversation_history = []
+            st.session_state.api_history = []
             st.session_state.user_data = {
                 "name": None,
                 "id": None,
@@ -380,10 +281,30 @@ def render_sidebar():
             st.write(f"**Backend:** {st.session_state.backend_url}")
 
 
-def render_chat_messages():
-    """Render all chat messages from conversation history."""
+# Messages rendered per rerun; older ones are behind a pagination button
+# so long sessions don't redraw (and re-ship over the websocket) their
+# entire history on every interaction
+VISIBLE_MESSAGES = 20
+
 
-    for msg in st.session_state.conversation_history:
+def render_chat_messages():
+    """Render recent chat messages, with pagination for older ones."""
+
+    history = st.session_state.conversation_history
+    visible = st.session_state.get("visible_messages", VISIBLE_MESSAGES)
+    hidden = len(history) - visible
+
+    if hidden > 0:
+        label = (
+            f"Show earlier messages ({hidden})"
+            if st.session_state.language == "en"
+            else f"הצג הודעות קודמות ({hidden})"
+        )
+        if st.button(label):
+            visible += VISIBLE_MESSAGES
+            st.session_state.visible_messages = visible
+
+    for msg in history[-visible:]:
         role = msg.get("role", "user")
         content = msg.get("content", "")
         sources = msg.get("sources", [])
@@ -422,68 +343,91 @@ def send_message(user_message: str):
     with st.chat_message("user"):
         st.write(user_message)
 
-    # Show thinking indicator
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..." if st.session_state.language == "en" else "חושב..."):
+        try:
+            # Get API client
+            api_client = get_api_client(st.session_state.backend_url)
+
+            # API-format history (role/content only, excludes the message
+            # we just added) is maintained incrementally in session state,
+            # so no O(N) stripped copy is rebuilt per turn
+            api_history = st.session_state.api_history
+
+            # Stream the reply into a placeholder as tokens arrive - the
+            # incremental text replaces the "Thinking..." spinner. If the
+            # stream fails, fall back to the blocking endpoint.
+            placeholder = st.empty()
+            response_data = None
+            buffer = ""
             try:
-                # Get API client
-                api_client = get_api_client(st.session_state.backend_url)
-
-                # Convert conversation history to API format (exclude sources)
-                api_history = [
-                    {"role": msg["role"], "content": msg["content"]}
-                    for msg in st.session_state.conversation_history[:-1]  # Exclude the message we just added
-                ]
-
-                # Send request to backend
-                response_data = api_client.send_message(
+                for event in api_client.send_message_stream(
                     message=user_message,
                     user_data=st.session_state.user_data,
                     conversation_history=api_history,
                     language=st.session_state.language
-                )
-
-                # Extract response
-                bot_response = response_data.get("response", "")
-                phase = response_data.get("phase", "collection")
-                updated_user_data = response_data.get("user_data", {})
-                sources = response_data.get("sources", [])
-
-                # Update session state
-                st.session_state.phase = phase
-                st.session_state.user_data = updated_user_data
-
-                # Add assistant message to history
-                assistant_msg = {
-                    "role": "assistant",
-                    "content": bot_response,
-                    "sources": sources
-                }
-                st.session_state.conversation_history.append(assistant_msg)
-
-                # Display bot response
-                st.write(bot_response)
-
-                # Display sources if in Q&A phase
-                if sources:
-                    with st.expander(f"📚 Sources ({len(sources)})"):
-                        for i, source in enumerate(sources[:5], 1):
-                            st.markdown(
-                                f"**{i}.** {source.get('service', source.get('category', 'N/A'))} | "
-                                f"HMO: {source.get('hmo')} | "
-                                f"Tier: {source.get('tier')} | "
-                                f"Score: {source.get('relevance_score', 0):.2f}"
-                            )
-
-                # Force rerun to update sidebar
-                st.rerun()
-
-            except Exception as e:
-                error_msg = str(e)
-                st.error(f"Error: {error_msg}")
-
-                # Remove the user message since we couldn't process it
-                st.session_state.conversation_history.pop()
+                ):
+                    if "delta" in event:
+                        buffer += event["delta"]
+                        placeholder.markdown(buffer)
+                    elif event.get("done"):
+                        response_data = event.get("response")
+            except Exception:
+                placeholder.empty()
+                with st.spinner("Thinking..." if st.session_state.language == "en" else "חושב..."):
+                    response_data = api_client.send_message(
+                        message=user_message,
+                        user_data=st.session_state.user_data,
+                        conversation_history=api_history,
+                        language=st.session_state.language
+                    )
+
+            if response_data is None:
+                raise Exception("Stream ended without a final response")
+
+            # Extract response
+            bot_response = response_data.get("response", "")
+            phase = response_data.get("phase", "collection")
+            updated_user_data = response_data.get("user_data", {})
+            sources = response_data.get("sources", [])
+
+            # Update session state
+            st.session_state.phase = phase
+            st.session_state.user_data = updated_user_data
+
+            # Add assistant message to history
+            assistant_msg = {
+                "role": "assistant",
+                "content": bot_response,
+                "sources": sources
+            }
+            st.session_state.conversation_history.append(assistant_msg)
+
+            # Extend the incremental API history only after the turn
+            # succeeded, keeping it aligned with conversation_history
+            api_history.append({"role": "user", "content": user_message})
+            api_history.append({"role": "assistant", "content": bot_response})
+
+            # Display bot response (final render covers the fallback path
+            # and any whitespace cleanup in the terminal event)
+            placeholder.markdown(bot_response)
+
+            # Display sources if in Q&A phase
+            if sources:
+                with st.expander(f"📚 Sources ({len(sources)})"):
+                    for i, source in enumerate(sources[:5], 1):
+                        st.markdown(
+                            f"**{i}.** {source.get('service', source.get('category', 'N/A'))} | "
+                            f"HMO: {source.get('hmo')} | "
+                            f"Tier: {source.get('tier')} | "
+                            f"Score: {source.get('relevance_score', 0):.2f}"
+                        )
+
+        except Exception as e:
+            error_msg = str(e)
+            st.error(f"Error: {error_msg}")
+
+            # Remove the user message since we couldn't process it
+            st.session_state.conversation_history.pop()
 
 
 def main():
@@ -501,16 +445,13 @@ def main():
     if st.session_state.language == "he":
         apply_rtl_styling()
 
-    # Render sidebar
-    render_sidebar()
-
     # Main chat area
     st.title("I am your Medical AI Assistant 👋")
 
     # Display conversation history
     render_chat_messages()
 
-    # Chat input
+    # Chat input (pinned to the bottom regardless of call order)
     user_input = st.chat_input(
         "Type your message..." if st.session_state.language == "en" else "הקלד הודעה..."
     )
@@ -518,6 +459,11 @@ def main():
     if user_input:
         send_message(user_input)
 
+    # Render the sidebar after the turn is processed: it then reflects the
+    # updated profile without forcing a full script rerun, which would
+    # redraw every prior message just to refresh the sidebar
+    render_sidebar()
+
 
 if __name__ == "__main__":
     main()
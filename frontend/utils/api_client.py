@@ -4,14 +4,20 @@ REST API client for Medical Services Chatbot backend.
 Handles all HTTP communication with the FastAPI backend.
 """
 
+import functools
 import os
+import orjson
 import requests
-from typing import Dict, List, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Any, Iterator, Optional
 import logging
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Library-style logging: no handler/level configuration at import time -
+# the embedding application decides what to show. %-style arguments keep
+# interpolation deferred until a handler actually emits the record.
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
 
 
 class ChatbotAPIClient:
@@ -32,9 +38,39 @@ class ChatbotAPIClient:
         """
         self.backend_url = backend_url.rstrip("/")
         self.chat_endpoint = f"{self.backend_url}/api/v1/chat"
+        self.chat_stream_endpoint = f"{self.backend_url}/api/v1/chat/stream"
+        self.chat_batch_endpoint = f"{self.backend_url}/api/v1/chat/batch"
         self.health_endpoint = f"{self.backend_url}/api/v1/health"
 
-        logger.info(f"API Client initialized with backend: {self.backend_url}")
+        # One pooled session instead of the module-level requests functions:
+        # keep-alive reuses the TCP (and TLS, on remote deployments)
+        # connection across turns, and transient gateway errors get a
+        # short automatic retry
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=["GET", "POST"]
+            )
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        logger.info("API Client initialized with backend: %s", self.backend_url)
+
+    def close(self):
+        """Close the underlying connection pool."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def send_message(
         self,
@@ -73,12 +109,14 @@ class ChatbotAPIClient:
                 "language": language
             }
 
-            logger.info(f"Sending message to {self.chat_endpoint}")
+            logger.debug("Sending message to %s", self.chat_endpoint)
 
-            # Send POST request
-            response = requests.post(
+            # Send POST request (orjson serializes the payload several
+            # times faster than the stdlib encoder requests would use)
+            response = self.session.post(
                 self.chat_endpoint,
-                json=payload,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
                 timeout=30  # 30 second timeout
             )
 
@@ -86,9 +124,9 @@ class ChatbotAPIClient:
             response.raise_for_status()
 
             # Parse JSON response
-            data = response.json()
+            data = orjson.loads(response.content)
 
-            logger.info(f"Received response: phase={data.get('phase')}")
+            logger.debug("Received response: phase=%s", data.get("phase"))
 
             return data
 
@@ -97,18 +135,18 @@ class ChatbotAPIClient:
             raise Exception("Request timed out. The server might be busy or offline.")
 
         except requests.exceptions.ConnectionError:
-            logger.error(f"Cannot connect to backend at {self.backend_url}")
+            logger.error("Cannot connect to backend at %s", self.backend_url)
             raise Exception(
                 f"Cannot connect to backend at {self.backend_url}. "
                 "Make sure the backend server is running."
             )
 
         except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error: {e}")
+            logger.error("HTTP error: %s", e)
 
             # Try to get error details from response
             try:
-                error_data = response.json()
+                error_data = orjson.loads(response.content)
                 error_msg = error_data.get("detail", str(e))
             except:
                 error_msg = str(e)
@@ -116,9 +154,119 @@ class ChatbotAPIClient:
             raise Exception(f"Backend error: {error_msg}")
 
         except Exception as e:
-            logger.error(f"Unexpected error: {e}")
+            logger.error("Unexpected error: %s", e)
             raise Exception(f"Failed to send message: {str(e)}")
 
+    def send_message_stream(
+        self,
+        message: str,
+        user_data: Dict[str, Any],
+        conversation_history: List[Dict[str, str]],
+        language: str = "he"
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Send a chat message and stream the response as it is generated.
+
+        Uses the /chat/stream SSE endpoint: Q&A answers arrive as
+        incremental text deltas instead of one blocking response, so the
+        UI can render tokens as they are decoded.
+
+        Args:
+            message: User's message
+            user_data: User profile data (name, id, hmo, tier, etc.)
+            conversation_history: List of previous messages
+            language: Conversation language ("he" or "en")
+
+        Yields:
+            Event dictionaries:
+            - {"delta": str} for each generated text piece
+            - {"done": True, "response": {...}} with the full response
+              (same shape send_message returns) once generation finishes
+
+        Raises:
+            Exception: If the request or the stream fails
+        """
+        payload = {
+            "message": message,
+            "user_data": user_data,
+            "conversation_history": conversation_history,
+            "language": language
+        }
+
+        logger.debug("Streaming message to %s", self.chat_stream_endpoint)
+
+        try:
+            with self.session.post(
+                self.chat_stream_endpoint,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                stream=True,
+                timeout=30
+            ) as response:
+                response.raise_for_status()
+
+                for line in response.iter_lines():
+                    if not line or not line.startswith(b"data: "):
+                        continue
+                    event = orjson.loads(line[len(b"data: "):])
+                    if "error" in event:
+                        raise Exception(f"Backend error: {event['error']}")
+                    yield event
+
+        except requests.exceptions.Timeout:
+            logger.error("Streaming request timed out (30s)")
+            raise Exception("Request timed out. The server might be busy or offline.")
+
+        except requests.exceptions.ConnectionError:
+            logger.error("Cannot connect to backend at %s", self.backend_url)
+            raise Exception(
+                f"Cannot connect to backend at {self.backend_url}. "
+                "Make sure the backend server is running."
+            )
+
+    def send_batch(self, turns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send several independent chat turns in one HTTP request.
+
+        For transcript replays and eval pipelines: amortizes the HTTP
+        round-trip and backend routing over N turns, which the backend
+        processes concurrently. Not used by the interactive chat flow.
+
+        Args:
+            turns: List of request dicts, each with the same shape
+                send_message posts (message, user_data,
+                conversation_history, language)
+
+        Returns:
+            List of response dicts, one per turn, in request order
+
+        Raises:
+            Exception: If the request fails
+        """
+        try:
+            logger.debug("Sending batch of %d turns to %s", len(turns), self.chat_batch_endpoint)
+
+            response = self.session.post(
+                self.chat_batch_endpoint,
+                data=orjson.dumps({"turns": turns}),
+                headers={"Content-Type": "application/json"},
+                timeout=120  # batches can queue behind the admission cap
+            )
+            response.raise_for_status()
+
+            return orjson.loads(response.content)["responses"]
+
+        except requests.exceptions.Timeout:
+            logger.error("Batch request timed out (120s)")
+            raise Exception("Batch request timed out. The server might be busy or offline.")
+
+        except requests.exceptions.ConnectionError:
+            logger.error("Cannot connect to backend at %s", self.backend_url)
+            raise Exception(
+                f"Cannot connect to backend at {self.backend_url}. "
+                "Make sure the backend server is running."
+            )
+
     def check_health(self) -> Dict[str, Any]:
         """
         Check backend health status.
@@ -133,18 +281,18 @@ class ChatbotAPIClient:
             Exception: If health check fails
         """
         try:
-            logger.info(f"Checking health at {self.health_endpoint}")
+            logger.debug("Checking health at %s", self.health_endpoint)
 
-            response = requests.get(
+            response = self.session.get(
                 self.health_endpoint,
                 timeout=5  # 5 second timeout for health check
             )
 
             response.raise_for_status()
 
-            data = response.json()
+            data = orjson.loads(response.content)
 
-            logger.info(f"Health check: {data.get('status')}")
+            logger.debug("Health check: %s", data.get("status"))
 
             return data
 
@@ -153,21 +301,23 @@ class ChatbotAPIClient:
             raise Exception("Health check timed out")
 
         except requests.exceptions.ConnectionError:
-            logger.error(f"Cannot connect to backend")
+            logger.error("Cannot connect to backend")
             raise Exception("Backend is offline or unreachable")
 
         except Exception as e:
-            logger.error(f"Health check failed: {e}")
+            logger.error("Health check failed: %s", e)
             raise Exception(f"Health check failed: {str(e)}")
 
 
-# Singleton instance
-_api_client = None
-
-
+@functools.cache
 def get_api_client(backend_url: Optional[str] = None) -> ChatbotAPIClient:
     """
-    Get singleton API client instance.
+    Get cached API client instance (one per backend URL).
+
+    functools.cache keeps repeat lookups to a C-level dict hit. It does
+    not lock construction, so Streamlit sessions racing the first call
+    can each build a client and all but one are dropped - a transient
+    extra requests.Session, which simply gets garbage collected.
 
     Args:
         backend_url: Backend URL (optional, defaults to BACKEND_URL env var or localhost:8000)
@@ -175,12 +325,7 @@ def get_api_client(backend_url: Optional[str] = None) -> ChatbotAPIClient:
     Returns:
         ChatbotAPIClient instance
     """
-    global _api_client
-
-    if _api_client is None:
-        # Use environment variable if available (Docker), otherwise use parameter or default
-        url = backend_url or os.getenv("BACKEND_URL", "http://localhost:8000")
-        logger.info(f"Initializing API client with backend URL: {url}")
-        _api_client = ChatbotAPIClient(url)
-
-    return _api_client
+    # Use environment variable if available (Docker), otherwise use parameter or default
+    url = backend_url or os.getenv("BACKEND_URL", "http://localhost:8000")
+    logger.info("Initializing API client with backend URL: %s", url)
+    return ChatbotAPIClient(url)
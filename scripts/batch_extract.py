@@ -0,0 +1,135 @@
+"""
+Offline extraction via the OpenAI Batch API.
+
+Replays historical user turns through the same EXTRACTION_PROMPT the live
+collection phase uses, but as a Batch API job instead of interactive calls:
+batch jobs run at half the interactive price with a 24h completion window,
+which suits transcript re-extraction and eval runs that have no latency
+requirement. The interactive chat path is untouched.
+
+Input: a JSONL file with one historical turn per line, each an object with
+at least a "message" field (and optionally "id" for stable custom_ids).
+
+Usage:
+    python scripts/batch_extract.py transcripts.jsonl
+    python scripts/batch_extract.py --status <batch_id>
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from openai import AzureOpenAI
+
+# Add parent directory to path to import settings
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+from settings import get_settings
+from backend.prompts.collection_prompt import EXTRACTION_PROMPT
+
+
+def build_batch_requests(transcript_path: Path, settings) -> list:
+    """
+    Build one Batch API request object per historical user turn.
+
+    Args:
+        transcript_path: JSONL file with {"message": ..., "id": ...} lines
+
+    Returns:
+        List of request dicts in the Batch API format
+    """
+    requests = []
+    with open(transcript_path, encoding="utf-8") as f:
+        for line_num, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            turn = json.loads(line)
+            requests.append({
+                "custom_id": str(turn.get("id", f"turn-{line_num}")),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": settings.AZURE_OPENAI_DEPLOYMENT_NAME,
+                    "messages": [
+                        {"role": "system", "content": EXTRACTION_PROMPT},
+                        {"role": "user", "content": turn["message"]}
+                    ],
+                    "temperature": 0.1,
+                    "max_tokens": 200
+                }
+            })
+    return requests
+
+
+def submit(transcript_path: Path) -> str:
+    """
+    Write the batch request file, upload it, and create the batch job.
+
+    Args:
+        transcript_path: JSONL file of historical turns
+
+    Returns:
+        The created batch job id
+    """
+    settings = get_settings()
+    client = AzureOpenAI(
+        api_key=settings.AZURE_OPENAI_KEY,
+        api_version=settings.AZURE_OPENAI_API_VERSION,
+        azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
+    )
+
+    requests = build_batch_requests(transcript_path, settings)
+    if not requests:
+        print(f"No turns found in {transcript_path}")
+        sys.exit(1)
+
+    batch_input_path = transcript_path.with_suffix(".batch.jsonl")
+    with open(batch_input_path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+    print(f"Wrote {len(requests)} batch requests to {batch_input_path}")
+
+    with open(batch_input_path, "rb") as f:
+        batch_file = client.files.create(file=f, purpose="batch")
+
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+    print(f"Created batch job: {batch.id} (status: {batch.status})")
+    print(f"Poll with: python scripts/batch_extract.py --status {batch.id}")
+    return batch.id
+
+
+def status(batch_id: str) -> None:
+    """Print the current status of a batch job."""
+    settings = get_settings()
+    client = AzureOpenAI(
+        api_key=settings.AZURE_OPENAI_KEY,
+        api_version=settings.AZURE_OPENAI_API_VERSION,
+        azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
+    )
+
+    batch = client.batches.retrieve(batch_id)
+    print(f"Batch {batch.id}: {batch.status}")
+    print(f"Requests: {batch.request_counts}")
+    if batch.output_file_id:
+        print(f"Output file: {batch.output_file_id}")
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--status":
+        status(sys.argv[2])
+    elif len(sys.argv) == 2:
+        submit(Path(sys.argv[1]))
+    else:
+        print("Usage: python scripts/batch_extract.py <transcripts.jsonl>")
+        print("       python scripts/batch_extract.py --status <batch_id>")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
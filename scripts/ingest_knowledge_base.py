@@ -10,55 +10,41 @@ Embeds chunks with Azure OpenAI ADA-002 and stores in ChromaDB.
 
 Usage:
     python scripts/ingest_knowledge_base.py
+    python scripts/ingest_knowledge_base.py --fast-ingest
 """
 
+import asyncio
+import hashlib
+import os
+import pickle
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import re
 from typing import List, Dict, Any, Tuple
 
 import chromadb
+import httpx
+import numpy as np
 from chromadb.config import Settings as ChromaSettings
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, APIError, RateLimitError
 
 # Add parent directory to path to import settings
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from settings import get_settings
 
 
-class KnowledgeBaseIngestion:
-    """Handles ingestion of medical service knowledge base into ChromaDB."""
-
-    def __init__(self):
-        """Initialize Azure OpenAI client and ChromaDB."""
-        # Load application settings
-        self.settings = get_settings()
-
-        # Azure OpenAI setup
-        self.openai_client = AzureOpenAI(
-            api_key=self.settings.AZURE_OPENAI_KEY,
-            api_version=self.settings.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=self.settings.AZURE_OPENAI_ENDPOINT
-        )
+class MarkdownChunkParser:
+    """
+    Extracts context, benefit and contact chunks from Markdown content.
 
-        # ChromaDB setup
-        self.chroma_client = chromadb.PersistentClient(
-            path="./vector_db",
-            settings=ChromaSettings(anonymized_telemetry=False)
-        )
-
-        # Delete existing collection if it exists
-        try:
-            self.chroma_client.delete_collection(name="medical_services")
-        except:
-            pass
-
-        # Create fresh collection
-        self.collection = self.chroma_client.create_collection(
-            name="medical_services",
-            metadata={"description": "Israeli health fund medical services knowledge base"}
-        )
+    Pure CPU work, split out from the ingestion driver so instances are
+    picklable (plain dicts and compiled patterns only): ingest_directory
+    fans the per-file parse out over a process pool.
+    """
 
+    def __init__(self):
+        """Build keyword maps and precompile extraction patterns."""
         # Infer category from directory structure (robust to filename changes)
         self.category_keywords = {
             "alternative": ["alternative", "רפואה משלימה"],
@@ -69,6 +55,13 @@ class KnowledgeBaseIngestion:
             "workshops": ["workshops", "סדנאות"]
         }
 
+        # Keywords lowercased once here so infer_category doesn't redo it
+        # for every keyword on every file
+        self._category_kw_lower = {
+            category: tuple(keyword.lower() for keyword in keywords)
+            for category, keywords in self.category_keywords.items()
+        }
+
         # HMO names in Hebrew and English (for detection)
         self.hmo_he_to_en = {
             "מכבי": "maccabi",
@@ -83,21 +76,22 @@ class KnowledgeBaseIngestion:
             "ארד": "bronze"
         }
 
-    def embed_text_batch(self, texts: List[str]) -> List[List[float]]:
-        """
-        Embed multiple texts using Azure OpenAI ADA-002 in a single API call.
-
-        Args:
-            texts: List of texts to embed (max 100 per batch)
-
-        Returns:
-            List of embedding vectors
-        """
-        response = self.openai_client.embeddings.create(
-            input=texts,
-            model="text-embedding-ada-002"
+        # Precompiled extraction patterns. These run per row/cell/line
+        # across every file, so they are compiled once here instead of
+        # being rebuilt (or looked up in re's pattern cache) on each call.
+        self._title_re = re.compile(r'^##\s+(.+)$', re.MULTILINE)
+        self._service_id_re = re.compile(r'[^\w\s]')
+        # One compiled matcher per HMO: a single case-insensitive scan of
+        # each header cell instead of two substring checks per HMO
+        self._hmo_header_res = [
+            (re.compile(f"{re.escape(hmo_he)}|{re.escape(hmo_en)}", re.IGNORECASE), hmo_en)
+            for hmo_he, hmo_en in self.hmo_he_to_en.items()
+        ]
+        self._contact_sections_re = re.compile(
+            r'###[^\n]*(?:טלפון|פרטים|contact|phone)[^\n]*\n+(.*?)(?=\n###|\n##|$)',
+            re.DOTALL | re.IGNORECASE
         )
-        return [item.embedding for item in response.data]
+        self._list_marker_re = re.compile(r'^[-*]\s*')
 
     def infer_category(self, file_path: Path) -> str:
         """
@@ -111,8 +105,8 @@ class KnowledgeBaseIngestion:
         """
         filename_lower = file_path.stem.lower()
 
-        for category, keywords in self.category_keywords.items():
-            if any(keyword.lower() in filename_lower for keyword in keywords):
+        for category, keywords in self._category_kw_lower.items():
+            if any(keyword in filename_lower for keyword in keywords):
                 return category
 
         # Fallback to filename stem
@@ -130,11 +124,11 @@ class KnowledgeBaseIngestion:
             Dictionary with chunk text and metadata
         """
         # Extract title (first H2 heading)
-        title_match = re.search(r'^##\s+(.+)$', markdown_content, re.MULTILINE)
+        title_match = self._title_re.search(markdown_content)
         title = title_match.group(1).strip() if title_match else ""
 
         # Find table start (first line with |)
-        lines = markdown_content.split('\n')
+        lines = markdown_content.splitlines()
         table_start_idx = None
         for i, line in enumerate(lines):
             if '|' in line:
@@ -186,7 +180,14 @@ class KnowledgeBaseIngestion:
 
     def parse_tier_benefits(self, cell_content: str) -> List[Tuple[str, str]]:
         """
-        Parse tier benefits from a table cell using flexible regex.
+        Parse tier benefits from a table cell with one linear scan.
+
+        Locates tier labels directly with str.find instead of the old
+        DOTALL-plus-lookahead regex: an occurrence of a tier name counts
+        as a label only when a colon follows (allowing the optional bold
+        markers around the name), and each benefits span runs from its
+        colon to the start of the next label - the same semantics the
+        regex had, without the backtracking.
 
         Args:
             cell_content: Cell content with tier benefits
@@ -194,20 +195,32 @@ class KnowledgeBaseIngestion:
         Returns:
             List of (tier_en, benefits) tuples
         """
-        results = []
-
-        # Flexible regex that handles variations:
-        # - Matches tier name with or without bold markers
-        # - Uses .+? instead of [^*]+? to handle bold text within benefits
-        # - Lookahead finds next tier or end of string
-        tier_names = '|'.join(self.tier_he_to_en.keys())
-        tier_pattern = rf'(?:\*\*)?({tier_names})(?:\*\*)?\s*:\s*(.+?)(?=(?:\*\*)?(?:{tier_names})(?:\*\*)?\s*:|$)'
-
-        matches = re.finditer(tier_pattern, cell_content, re.DOTALL)
+        # Each label is (span_start, benefits_start, tier_he), where
+        # span_start includes a preceding ** so it terminates the previous
+        # benefits span before the bold marker
+        labels: List[Tuple[int, int, str]] = []
+
+        for tier_he in self.tier_he_to_en:
+            idx = cell_content.find(tier_he)
+            while idx != -1:
+                pos = idx + len(tier_he)
+                if cell_content.startswith('**', pos):
+                    pos += 2
+                while pos < len(cell_content) and cell_content[pos].isspace():
+                    pos += 1
+                if pos < len(cell_content) and cell_content[pos] == ':':
+                    span_start = idx
+                    if idx >= 2 and cell_content.startswith('**', idx - 2):
+                        span_start = idx - 2
+                    labels.append((span_start, pos + 1, tier_he))
+                idx = cell_content.find(tier_he, idx + 1)
+
+        labels.sort()
 
-        for match in matches:
-            tier_he = match.group(1).strip()
-            benefits = match.group(2).strip()
+        results = []
+        for i, (span_start, benefits_start, tier_he) in enumerate(labels):
+            end = labels[i + 1][0] if i + 1 < len(labels) else len(cell_content)
+            benefits = cell_content[benefits_start:end].strip()
 
             # Map to English
             tier_en = self.tier_he_to_en.get(tier_he, tier_he)
@@ -216,6 +229,32 @@ class KnowledgeBaseIngestion:
 
         return results
 
+    def _iter_table_rows(self, lines: List[str]):
+        """
+        Stream a file's table rows in a single pass, as (is_header, row).
+
+        The first line containing '|' is the header; the Markdown
+        separator line right after it is skipped; every later line flows
+        through as a data row (non-table lines split into no cells and
+        fall out downstream). Replaces the old two-pass structure that
+        scanned every line for the table boundaries and then re-iterated
+        a stored slice.
+
+        Args:
+            lines: The file content split into lines
+
+        Yields:
+            (is_header, row) tuples
+        """
+        header_idx = None
+        for i, line in enumerate(lines):
+            if header_idx is None:
+                if '|' in line:
+                    header_idx = i
+                    yield True, line
+            elif i > header_idx + 1:
+                yield False, line
+
     def extract_benefit_chunks(self, markdown_content: str, category: str) -> List[Dict[str, Any]]:
         """
         Extract benefit chunks from Markdown table (service x HMO x tier).
@@ -228,43 +267,23 @@ class KnowledgeBaseIngestion:
             List of dictionaries with chunk text and metadata
         """
         chunks = []
-        lines = markdown_content.split('\n')
-
-        # Find table boundaries
-        table_start = None
-        table_end = None
-
-        for i, line in enumerate(lines):
-            if '|' in line:
-                if table_start is None:
-                    table_start = i
-                table_end = i
-
-        if table_start is None:
-            return chunks
-
-        # Extract table lines
-        table_lines = lines[table_start:table_end + 1]
+        lines = markdown_content.splitlines()
 
-        # First line is header
-        if len(table_lines) < 3:
-            return chunks
-
-        header_row = table_lines[0]
-        headers = self.parse_table_headers(header_row)
-
-        # Find which columns are HMOs (skip first column which is service name)
+        headers: List[str] = []
         hmo_columns = {}
-        for i, header in enumerate(headers[1:], start=1):
-            for hmo_he, hmo_en in self.hmo_he_to_en.items():
-                if hmo_he in header or hmo_en in header:
-                    hmo_columns[i] = hmo_en
-                    break
 
-        # Process data rows (skip header and separator)
-        data_rows = table_lines[2:]
+        for is_header, row in self._iter_table_rows(lines):
+            if is_header:
+                headers = self.parse_table_headers(row)
+
+                # Find which columns are HMOs (skip first column which is service name)
+                for i, header in enumerate(headers[1:], start=1):
+                    for pattern, hmo_en in self._hmo_header_res:
+                        if pattern.search(header):
+                            hmo_columns[i] = hmo_en
+                            break
+                continue
 
-        for row in data_rows:
             if not row.strip() or '---' in row:
                 continue
 
@@ -284,7 +303,7 @@ class KnowledgeBaseIngestion:
                 continue
 
             # Normalize service name for metadata
-            service_id = re.sub(r'[^\w\s]', '', service_name)
+            service_id = self._service_id_re.sub('', service_name)
             service_id = service_id.replace(' ', '_').lower()
 
             # Process each HMO column
@@ -343,27 +362,26 @@ class KnowledgeBaseIngestion:
 
         # Find sections with contact information
         # Look for H3 headings that mention phone or contact
-        contact_sections = re.findall(
-            r'###[^\n]*(?:טלפון|פרטים|contact|phone)[^\n]*\n+(.*?)(?=\n###|\n##|$)',
-            markdown_content,
-            re.DOTALL | re.IGNORECASE
-        )
+        contact_sections = self._contact_sections_re.findall(markdown_content)
 
-        # Combine all contact sections
-        contact_text = '\n'.join(contact_sections)
-
-        # Extract contact info for each HMO
-        for hmo_he, hmo_en in self.hmo_he_to_en.items():
-            # Find all lines mentioning this HMO
-            hmo_info = []
+        # Bucket contact lines per HMO in one pass over the sections
+        # instead of rejoining the text and rescanning it once per HMO
+        buckets: Dict[str, List[str]] = {
+            hmo_en: [] for hmo_en in self.hmo_he_to_en.values()
+        }
 
-            for line in contact_text.split('\n'):
+        for section in contact_sections:
+            for line in section.splitlines():
                 line = line.strip()
-                if hmo_he in line or hmo_en.lower() in line.lower():
-                    # Clean up list markers
-                    line = re.sub(r'^[-*]\s*', '', line)
-                    hmo_info.append(line)
+                if not line:
+                    continue
+                line_lower = line.lower()
+                for hmo_he, hmo_en in self.hmo_he_to_en.items():
+                    if hmo_he in line or hmo_en in line_lower:
+                        # Clean up list markers
+                        buckets[hmo_en].append(self._list_marker_re.sub('', line))
 
+        for hmo_en, hmo_info in buckets.items():
             if hmo_info:
                 chunk_text = f"קופת חולים: {hmo_en}\nקטגוריה: {category}\nפרטי התקשרות:\n" + "\n".join(hmo_info)
 
@@ -379,40 +397,155 @@ class KnowledgeBaseIngestion:
 
         return chunks
 
-    def process_markdown_file(self, file_path: Path) -> List[Dict[str, Any]]:
+    def parse_content(self, content: str, category: str) -> List[Dict[str, Any]]:
         """
-        Process a single Markdown file and extract all chunks.
+        Extract all chunks from one file's content.
 
         Args:
-            file_path: Path to Markdown file
+            content: Full Markdown file content
+            category: Category name (dental, optometry, etc.)
 
         Returns:
             List of all chunks (context + benefits + contacts)
         """
-        # Infer category from filename
-        category = self.infer_category(file_path)
+        all_chunks = [self.extract_context_chunk(content, category)]
+        all_chunks.extend(self.extract_benefit_chunks(content, category))
+        all_chunks.extend(self.extract_contact_chunks(content, category))
+        return all_chunks
 
-        # Read file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
 
-        all_chunks = []
+class KnowledgeBaseIngestion:
+    """Handles ingestion of medical service knowledge base into ChromaDB."""
+
+    def __init__(self, fast_ingest: bool = False):
+        """
+        Initialize Azure OpenAI client and ChromaDB.
+
+        Args:
+            fast_ingest: Relax SQLite durability for the bulk load
+        """
+        # Load application settings
+        self.settings = get_settings()
 
-        # Extract context chunk
-        context_chunk = self.extract_context_chunk(content, category)
-        all_chunks.append(context_chunk)
+        # Azure OpenAI setup (async: embedding batches run concurrently).
+        # Explicit pool limits so the gathered batches actually run in
+        # parallel over kept-alive connections, and a longer read timeout
+        # since large embedding batches take a while to come back.
+        self.openai_client = AsyncAzureOpenAI(
+            api_key=self.settings.AZURE_OPENAI_KEY,
+            api_version=self.settings.AZURE_OPENAI_API_VERSION,
+            azure_endpoint=self.settings.AZURE_OPENAI_ENDPOINT,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                timeout=httpx.Timeout(60.0)
+            )
+        )
 
-        # Extract benefit chunks
-        benefit_chunks = self.extract_benefit_chunks(content, category)
-        all_chunks.extend(benefit_chunks)
+        # Cap in-flight embedding requests so the concurrent batches
+        # don't trip the endpoint's rate limit
+        self._embed_semaphore = asyncio.Semaphore(10)
 
-        # Extract contact chunks
-        contact_chunks = self.extract_contact_chunks(content, category)
-        all_chunks.extend(contact_chunks)
+        # ChromaDB setup
+        self.chroma_client = chromadb.PersistentClient(
+            path="./vector_db",
+            settings=ChromaSettings(anonymized_telemetry=False)
+        )
 
-        return all_chunks
+        if fast_ingest:
+            self._tune_sqlite()
+
+        # On-disk ingest cache: parsed chunks keyed by file content hash,
+        # embeddings keyed by chunk text hash. Re-runs over unchanged
+        # files skip both the parsing and the Azure embedding calls.
+        self._cache_path = Path("./vector_db/_ingest_cache.pkl")
+        self._parse_cache: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._embedding_cache: Dict[str, np.ndarray] = {}
+        try:
+            with open(self._cache_path, "rb") as f:
+                cached = pickle.load(f)
+            self._parse_cache = cached.get("chunks", {})
+            self._embedding_cache = cached.get("embeddings", {})
+            print(f"Loaded ingest cache ({len(self._embedding_cache)} embeddings)")
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            pass
+
+        # The collection itself is opened (or recreated) inside
+        # ingest_directory, once the corpus hash says a rebuild is needed
+
+        # Markdown extraction lives in its own (picklable) parser so the
+        # per-file parse can run in worker processes
+        self.parser = MarkdownChunkParser()
 
-    def ingest_directory(self, input_dir: str = "data/knowledge_base_markdown") -> None:
+    def _tune_sqlite(self) -> None:
+        """
+        Relax SQLite durability on Chroma's connection for the bulk load.
+
+        Turns off journaling and fsyncs for the duration of the ingest,
+        which removes most of the disk I/O from the one big add(). Unsafe
+        on crash, but this script rebuilds the collection from scratch, so
+        a failed run is simply rerun.
+
+        Reaches into Chroma's private connection pool, so everything is
+        guarded: if the internals have moved in a newer chromadb, the
+        ingest just runs at normal speed.
+        """
+        try:
+            sysdb = getattr(self.chroma_client, "_sysdb", None)
+            if sysdb is None:
+                sysdb = self.chroma_client._server._sysdb
+            conn = sysdb._conn_pool.connect()
+            for pragma in (
+                "journal_mode = off",
+                "synchronous = off",
+                "temp_store = memory",
+                "locking_mode = exclusive"
+            ):
+                conn.execute(f"pragma {pragma}")
+            print("Fast ingest: SQLite durability relaxed for this run")
+        except Exception as e:
+            print(f"Fast ingest unavailable ({e}); continuing at normal speed")
+
+    def _save_cache(self) -> None:
+        """Persist the parse/embedding cache next to the vector store."""
+        with open(self._cache_path, "wb") as f:
+            pickle.dump(
+                {"chunks": self._parse_cache, "embeddings": self._embedding_cache},
+                f
+            )
+
+    async def embed_text_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed multiple texts using Azure OpenAI ADA-002 in a single API call.
+
+        Runs under the shared semaphore so that concurrently scheduled
+        batches keep at most 10 requests in flight; transient rate-limit
+        and API errors get a short exponential backoff.
+
+        Args:
+            texts: List of texts to embed (up to 2048 inputs per request)
+
+        Returns:
+            float32 array of embedding vectors, one row per input
+        """
+        async with self._embed_semaphore:
+            for attempt in range(3):
+                try:
+                    response = await self.openai_client.embeddings.create(
+                        input=texts,
+                        model="text-embedding-ada-002"
+                    )
+                    return np.asarray(
+                        [item.embedding for item in response.data],
+                        dtype=np.float32
+                    )
+                except (RateLimitError, APIError):
+                    if attempt == 2:
+                        raise
+                    delay = 2.0 * (2 ** attempt)
+                    print(f"  Transient embedding error, retrying in {delay:.0f}s...")
+                    await asyncio.sleep(delay)
+
+    async def ingest_directory(self, input_dir: str = "data/knowledge_base_markdown") -> None:
         """
         Process all Markdown files and ingest into ChromaDB.
 
@@ -435,13 +568,84 @@ class KnowledgeBaseIngestion:
         print(f"Found {len(md_files)} Markdown files")
         print(f"Processing chunks...\n")
 
+        # Read everything once: the contents feed the corpus hash, the
+        # parse-cache keys and the parser
+        file_contents = [
+            (md_file, md_file.read_text(encoding='utf-8'))
+            for md_file in md_files
+        ]
+
+        corpus_hasher = hashlib.sha256()
+        for _, content in file_contents:
+            corpus_hasher.update(content.encode())
+        corpus_sha = corpus_hasher.hexdigest()
+
+        # If the corpus is byte-identical to what the existing collection
+        # was built from, its HNSW index is already correct - rebuilding
+        # it is the dominant cost of a re-run, so skip the whole ingest
+        try:
+            existing = self.chroma_client.get_collection(name="medical_services")
+            if (existing.metadata or {}).get("content_hash") == corpus_sha:
+                print("Knowledge base unchanged - reusing existing collection")
+                print(f"  Collection count: {existing.count()}")
+                return
+            self.chroma_client.delete_collection(name="medical_services")
+        except Exception:
+            pass
+
+        # Create fresh collection. HNSW parameters are set at creation:
+        # a denser graph (M=24) and construction_ef=200 raise recall for
+        # the small top-k queries the backend runs, at a memory cost that
+        # is negligible for a corpus this size; search_ef=64 keeps query
+        # latency flat.
+        self.collection = self.chroma_client.create_collection(
+            name="medical_services",
+            metadata={
+                "description": "Israeli health fund medical services knowledge base",
+                "content_hash": corpus_sha,
+                "hnsw:space": "cosine",
+                "hnsw:construction_ef": 200,
+                "hnsw:M": 24,
+                "hnsw:search_ef": 64
+            }
+        )
+
+        # Files already in the parse cache short-circuit; only the misses
+        # fan out over a process pool - extraction is pure CPU and each
+        # file is an independent parse unit
+        parsed: Dict[Path, List[Dict[str, Any]]] = {}
+        pending_parse: List[Tuple[Path, Tuple[str, str], str, str]] = []
+
+        for md_file, content in file_contents:
+            category = self.parser.infer_category(md_file)
+
+            cache_key = (hashlib.sha256(content.encode()).hexdigest(), category)
+            cached = self._parse_cache.get(cache_key)
+            if cached is not None:
+                parsed[md_file] = cached
+            else:
+                pending_parse.append((md_file, cache_key, content, category))
+
+        if pending_parse:
+            with ProcessPoolExecutor(max_workers=min(len(pending_parse), os.cpu_count() or 1)) as pool:
+                futures = {
+                    pool.submit(self.parser.parse_content, content, category): (md_file, cache_key)
+                    for md_file, cache_key, content, category in pending_parse
+                }
+
+                for future in as_completed(futures):
+                    md_file, cache_key = futures[future]
+                    chunks = future.result()
+                    self._parse_cache[cache_key] = chunks
+                    parsed[md_file] = chunks
+
         all_chunks = []
         chunk_counts = {"context": 0, "benefit": 0, "contact": 0}
 
-        # Process each file
+        # Collect in file order so chunk ids stay stable across runs
         for md_file in md_files:
             print(f"Processing: {md_file.name}")
-            chunks = self.process_markdown_file(md_file)
+            chunks = parsed[md_file]
 
             # Count by type
             for chunk in chunks:
@@ -459,30 +663,70 @@ class KnowledgeBaseIngestion:
         # Embed chunks in batches
         print(f"\nEmbedding chunks with ADA-002 (batched)...")
 
-        documents = []
-        embeddings = []
-        metadatas = []
-        ids = []
-
-        batch_size = 20
-        total_embedded = 0
-
-        for i in range(0, len(all_chunks), batch_size):
-            batch = all_chunks[i:i + batch_size]
-            batch_texts = [chunk["text"] for chunk in batch]
-
-            # Embed batch
-            batch_embeddings = self.embed_text_batch(batch_texts)
-
-            # Collect results
-            for j, chunk in enumerate(batch):
-                documents.append(chunk["text"])
-                embeddings.append(batch_embeddings[j])
-                metadatas.append(chunk["metadata"])
-                ids.append(f"chunk_{total_embedded + j}")
-
-            total_embedded += len(batch)
-            print(f"  Embedded {total_embedded}/{len(all_chunks)} chunks")
+        # Only texts missing from the embedding cache go to Azure; the
+        # dict also deduplicates identical chunk texts within the run
+        text_shas = [
+            hashlib.sha256(chunk["text"].encode()).hexdigest()
+            for chunk in all_chunks
+        ]
+        pending: Dict[str, str] = {
+            sha: chunk["text"]
+            for sha, chunk in zip(text_shas, all_chunks)
+            if sha not in self._embedding_cache
+        }
+        print(f"  {len(all_chunks) - len(pending)} embeddings cached, {len(pending)} to embed")
+
+        if pending:
+            # The embeddings endpoint accepts far more than 20 inputs per
+            # call, so batch at 256 to cut the request count (and the
+            # per-request latency floor) by an order of magnitude. The
+            # character guard keeps any single request well inside the
+            # service's total-token limit even if individual chunks run long.
+            batch_size = 256
+            max_batch_chars = 300_000
+
+            batches: List[List[Tuple[str, str]]] = []
+            current: List[Tuple[str, str]] = []
+            current_chars = 0
+
+            for sha, text in pending.items():
+                if current and (len(current) >= batch_size or current_chars + len(text) > max_batch_chars):
+                    batches.append(current)
+                    current = []
+                    current_chars = 0
+                current.append((sha, text))
+                current_chars += len(text)
+
+            if current:
+                batches.append(current)
+
+            # Fire all batches concurrently; the semaphore inside
+            # embed_text_batch bounds how many are actually in flight
+            tasks = [
+                self.embed_text_batch([text for _, text in batch])
+                for batch in batches
+            ]
+            batch_embeddings_list = await asyncio.gather(*tasks)
+
+            for batch, batch_embeddings in zip(batches, batch_embeddings_list):
+                for (sha, _), embedding in zip(batch, batch_embeddings):
+                    self._embedding_cache[sha] = embedding
+
+            print(f"  Embedded {len(pending)} chunks in {len(batches)} requests")
+
+        self._save_cache()
+
+        # Assemble the add() arrays in single passes; every embedding is
+        # now present in the cache, so order follows all_chunks directly.
+        # One contiguous float32 matrix (4 bytes/value vs a boxed Python
+        # float each) goes straight into Chroma without a conversion pass.
+        documents = [chunk["text"] for chunk in all_chunks]
+        metadatas = [chunk["metadata"] for chunk in all_chunks]
+        ids = [f"chunk_{i}" for i in range(len(all_chunks))]
+        embeddings = np.asarray(
+            [self._embedding_cache[sha] for sha in text_shas],
+            dtype=np.float32
+        )
 
         # Store in ChromaDB
         print(f"\nStoring in ChromaDB...")
@@ -508,8 +752,8 @@ def main():
     print("=" * 60)
     print()
 
-    ingestion = KnowledgeBaseIngestion()
-    ingestion.ingest_directory()
+    ingestion = KnowledgeBaseIngestion(fast_ingest="--fast-ingest" in sys.argv)
+    asyncio.run(ingestion.ingest_directory())
 
     print()
     print("Ingestion complete!")